@@ -0,0 +1,20 @@
+"""ASGI entry point: async JSON API on PyMongo's asyncio driver, Flask for the rest.
+
+    uvicorn asgi:application --workers 4
+
+/api/courses, /api/course/<slug>, /api/my-courses and POST /progress/<slug>
+are served by routes/async_api.py without tying up a thread while MongoDB
+responds; every other URL is handed to the regular Flask app (see utils/asgi.py).
+"""
+from factory import create_app, warm_up
+from routes.async_api import router
+from utils.asgi import AsgiApp
+
+app = create_app()
+
+
+async def startup():
+    warm_up(app, indexes=False)
+
+
+application = AsgiApp(app, router, on_startup=[startup], on_shutdown=[app.extensions["mongo"].close_async])
@@ -0,0 +1,362 @@
+"""Request latency, throughput and DB round-trips for the main student/instructor flows.
+
+Drives the Flask app in-process with its test client against mongomock (the
+default) or a local mongod, after seeding synthetic users, courses and
+enrollments:
+
+    python benchmarks/bench_app.py --students 2000 --courses 500 --requests 300
+    python benchmarks/bench_app.py --uri mongodb://127.0.0.1:27017 --students 20000
+
+my_courses and enrolled_students use $lookup sub-pipelines, which mongomock
+does not implement, so they only run with --uri.
+
+The app is built with create_app() from its own settings and database
+(elearn_bench, dropped before seeding), so a real config.py is never used.
+
+Results can be saved and later runs compared against them. A scenario
+regresses when its p95 grows by more than --tolerance, or its DB round-trips
+per request by more than --trip-tolerance (cache hit rates shift a little
+between runs, so round-trips are averages rather than exact counts). Any regression exits with status 1:
+
+    python benchmarks/bench_app.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_app.py --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import types
+from datetime import datetime, timedelta
+from functools import wraps
+
+import bcrypt
+from bson import ObjectId
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = "benchmark-password"
+BCRYPT_ROUNDS = 4
+SCENARIOS = ("login", "catalog", "course_detail", "enroll", "my_courses", "enrolled_students")
+MONGOD_ONLY = {"my_courses", "enrolled_students"}
+
+
+# ─────────────────────────────────────
+# DB ROUND-TRIP COUNTING
+# ─────────────────────────────────────
+class RoundTrips:
+    def __init__(self):
+        self.count = 0
+        self._local = threading.local()
+
+    def command_listener(self):
+        from pymongo import monitoring
+
+        counter = self
+
+        class Listener(monitoring.CommandListener):
+            def started(self, event):
+                counter.count += 1
+
+            def succeeded(self, event):
+                pass
+
+            def failed(self, event):
+                pass
+
+        return Listener()
+
+    def patch_mongomock(self):
+        """Count each top-level Collection call as one round-trip (mongomock has no command events)."""
+        from mongomock.collection import Collection
+
+        methods = ("find", "find_one", "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+                   "delete_one", "delete_many", "aggregate", "bulk_write", "count_documents", "distinct",
+                   "find_one_and_update", "find_one_and_replace", "find_one_and_delete", "estimated_document_count")
+        for name in methods:
+            setattr(Collection, name, self._counted(getattr(Collection, name)))
+
+    def _counted(self, method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            # mongomock calls its own public methods internally (find_one -> find)
+            depth = getattr(self._local, "depth", 0)
+            if depth == 0:
+                self.count += 1
+            self._local.depth = depth + 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._local.depth = depth
+        return wrapper
+
+
+def bench_config(args, round_trips):
+    if args.uri:
+        from pymongo import MongoClient
+
+        def client_factory(uri, **options):
+            options["event_listeners"] = list(options.get("event_listeners", [])) + [round_trips.command_listener()]
+            return MongoClient(uri, **options)
+        uri = args.uri
+    else:
+        import mongomock
+
+        round_trips.patch_mongomock()
+        shared = mongomock.MongoClient()
+
+        def client_factory(uri, **options):
+            return shared
+        uri = "mongodb://mongomock"
+
+    config = types.ModuleType("config")
+    config.SECRET_KEY = "benchmark"
+    config.MONGODB_URI = uri
+    config.MONGODB_DATABASE = "elearn_bench"
+    config.MONGO_CLIENT_FACTORY = client_factory
+    config.BCRYPT_LOG_ROUNDS = BCRYPT_ROUNDS
+    config.ENSURE_INDEXES_ON_STARTUP = False
+    config.RESPONSE_CACHE_BACKEND = None if args.response_cache == "none" else args.response_cache
+    config.MAIL_SERVER = "localhost"
+    config.MAIL_PORT = 25
+    config.MAIL_USE_TLS = False
+    config.MAIL_USERNAME = None
+    config.MAIL_PASSWORD = None
+    config.MAIL_DEFAULT_SENDER = "bench@example.com"
+    return config
+
+
+# ─────────────────────────────────────
+# SEEDING
+# ─────────────────────────────────────
+def seed(db, students, courses, instructors, enrollments_per_student, rng):
+    from models.indexes import ensure_indexes
+
+    for name in ("users", "courses", "enrollments", "course_stats", "schema_migrations"):
+        db.drop_collection(name)
+    ensure_indexes(db)
+
+    password = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+    now = datetime.now()
+
+    instructor_docs = [
+        {"_id": ObjectId(), "email": f"instructor{i}@bench.test", "password": password, "role": "instructor",
+         "first_name": "Instructor", "last_name": str(i), "session_version": 0}
+        for i in range(instructors)
+    ]
+    student_docs = [
+        {"_id": ObjectId(), "email": f"student{i}@bench.test", "password": password, "role": "student",
+         "first_name": "Student", "last_name": str(i), "session_version": 0}
+        for i in range(students)
+    ]
+    db.users.insert_many(instructor_docs + student_docs)
+
+    course_docs = []
+    for i in range(courses):
+        instructor = instructor_docs[i % instructors]
+        course_docs.append({
+            "_id": ObjectId(), "title": f"Course {i}", "slug": f"course-{i}",
+            "description": f"Synthetic course number {i} for benchmarking.",
+            "instructor_id": instructor["_id"], "instructor_name": f"Instructor {i % instructors}",
+            "image": "default_course.jpg", "image_variants": [],
+            "enrollment_count": 0, "completed_count": 0, "created_at": now - timedelta(minutes=i),
+        })
+    db.courses.insert_many(course_docs)
+
+    enrollments = []
+    counts = {}
+    for student in student_docs:
+        for course in rng.sample(course_docs, min(enrollments_per_student, len(course_docs))):
+            enrollments.append({
+                "student_id": student["_id"], "course_id": course["_id"], "completed": rng.random() < 0.2,
+                "enrolled_at": now - timedelta(days=rng.randrange(60)), "last_activity_at": now,
+            })
+            counts[course["_id"]] = counts.get(course["_id"], 0) + 1
+        if len(enrollments) >= 10_000:
+            db.enrollments.insert_many(enrollments)
+            enrollments = []
+    if enrollments:
+        db.enrollments.insert_many(enrollments)
+    for course_id, count in counts.items():
+        db.courses.update_one({"_id": course_id}, {"$set": {"enrollment_count": count}})
+
+    return student_docs, instructor_docs, course_docs
+
+
+# ─────────────────────────────────────
+# SCENARIOS
+# ─────────────────────────────────────
+def logged_in_client(app, user):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = str(user["_id"])
+        session["uv"] = user.get("session_version", 0)
+    return client
+
+
+def build_scenarios(app, students, instructors, courses, rng, pool_size=50):
+    student_clients = [(logged_in_client(app, s), s) for s in rng.sample(students, min(pool_size, len(students)))]
+    instructor_clients = [(logged_in_client(app, i), i) for i in instructors[:pool_size]]
+    courses_by_instructor = {}
+    for course in courses:
+        courses_by_instructor.setdefault(course["instructor_id"], []).append(course)
+
+    def login():
+        student = rng.choice(students)
+        return app.test_client().post("/auth/login", data={"email": student["email"], "password": PASSWORD})
+
+    def catalog():
+        return rng.choice(student_clients)[0].get("/courses")
+
+    def course_detail():
+        return rng.choice(student_clients)[0].get(f"/course/{rng.choice(courses)['slug']}")
+
+    def enroll():
+        return rng.choice(student_clients)[0].post(f"/enroll/{rng.choice(courses)['slug']}")
+
+    def my_courses():
+        return rng.choice(student_clients)[0].get("/my-courses")
+
+    def enrolled_students():
+        client, instructor = rng.choice(instructor_clients)
+        course = rng.choice(courses_by_instructor.get(instructor["_id"]) or courses)
+        return client.get(f"/enrolled-students/{course['_id']}")
+
+    return {
+        "login": login,
+        "catalog": catalog,
+        "course_detail": course_detail,
+        "enroll": enroll,
+        "my_courses": my_courses,
+        "enrolled_students": enrolled_students,
+    }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_scenario(fn, requests, warmup, round_trips):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    statuses = {}
+    trips = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        before = round_trips.count
+        request_started = time.perf_counter()
+        response = fn()
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        trips += round_trips.count - before
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "rps": round(requests / elapsed, 1),
+        "db_round_trips": round(trips / requests, 2),
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "errors": sum(n for code, n in statuses.items() if code >= 500),
+    }
+
+
+def compare(results, baseline, tolerance, trip_tolerance):
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("scenarios", {}).get(name)
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} of {result['requests']} requests failed")
+        if not before:
+            continue
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if result["db_round_trips"] > before["db_round_trips"] * (1 + trip_tolerance) + 0.01:
+            regressions.append(f"{name}: DB round-trips {before['db_round_trips']} -> {result['db_round_trips']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", help="Benchmark against this mongod instead of mongomock")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--instructors", type=int, default=20)
+    parser.add_argument("--enrollments-per-student", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--response-cache", choices=("memory", "filesystem", "none"), default="memory",
+                        help="RESPONSE_CACHE_BACKEND for the run (filesystem uses the instance folder)")
+    parser.add_argument("--baseline", help="Compare against this results file and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative p95 increase")
+    parser.add_argument("--trip-tolerance", type=float, default=0.1, help="Allowed relative DB round-trip increase")
+    parser.add_argument("--save-baseline", help="Write this run's results here")
+    args = parser.parse_args()
+    if args.scenarios:
+        names = args.scenarios.split(",")
+    else:
+        names = [name for name in SCENARIOS if args.uri or name not in MONGOD_ONLY]
+        if not args.uri:
+            print(f"skipping {', '.join(sorted(MONGOD_ONLY))} (need --uri, see --help)")
+
+    round_trips = RoundTrips()
+    from factory import create_app
+
+    app = create_app(bench_config(args, round_trips))
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        started = time.perf_counter()
+        students, instructors, courses = seed(
+            app.db, args.students, args.courses, args.instructors, args.enrollments_per_student, rng,
+        )
+        print(f"seeded {len(students)} students, {len(courses)} courses in {time.perf_counter() - started:.1f}s "
+              f"({'mongod' if args.uri else 'mongomock'})")
+
+    scenarios = build_scenarios(app, students, instructors, courses, rng)
+    results = {}
+    print(f"{'scenario':<18} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8} {'db/req':>7}  statuses")
+    for name in names:
+        result = run_scenario(scenarios[name], args.requests, args.warmup, round_trips)
+        results[name] = result
+        print(f"{name:<18} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms "
+              f"{result['rps']:>8.1f} {result['db_round_trips']:>7.2f}  {result['statuses']}")
+
+    report = {
+        "backend": "mongod" if args.uri else "mongomock",
+        "scale": {"students": args.students, "courses": args.courses, "instructors": args.instructors,
+                  "enrollments_per_student": args.enrollments_per_student},
+        "scenarios": results,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"saved baseline to {args.save_baseline}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("scale") != report["scale"] or baseline.get("backend") != report["backend"]:
+            print("warning: baseline was recorded with a different backend or scale")
+    regressions = compare(results, baseline, args.tolerance, args.trip_tolerance)
+    if regressions:
+        print("\nREGRESSIONS" + (f" against {args.baseline}" if args.baseline else ""))
+        for line in regressions:
+            print("  " + line)
+        sys.exit(1)
+    if args.baseline:
+        print(f"\nno regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
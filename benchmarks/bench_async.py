@@ -0,0 +1,146 @@
+"""Sync (WSGI, threads) vs async (ASGI, asyncio driver) serving at high concurrency.
+
+Start both servers against the same database, then point this at them:
+
+    gunicorn -w 4 --threads 8 'app:app' -b 127.0.0.1:8000 &
+    uvicorn asgi:application --workers 4 --port 8001 &
+    python benchmarks/bench_async.py --sync-url http://127.0.0.1:8000 --async-url http://127.0.0.1:8001 \\
+        --email student0@bench.test --password benchmark-password --slug course-1 --concurrency 16,128,512
+
+(benchmarks/bench_app.py --uri ... seeds a database with matching users.)
+Both servers serve the same /api/* payloads: routes/api_route.py for the
+sync one and routes/async_api.py for the async one. Each connection is
+kept alive and sends one request at a time, so concurrency is the number
+of in-flight requests.
+"""
+import argparse
+import asyncio
+import http.client
+import statistics
+import time
+from urllib.parse import urlencode, urlsplit
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def login(base, email, password):
+    url = urlsplit(base)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    conn.request("POST", "/auth/login", urlencode({"email": email, "password": password}),
+                 {"Content-Type": "application/x-www-form-urlencoded"})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader("Set-Cookie")
+    conn.close()
+    if not cookie or "session=" not in cookie:
+        raise SystemExit(f"login failed against {base} (status {response.status})")
+    return cookie.split(";", 1)[0]
+
+
+async def request(reader, writer, host, method, path, cookie, body=b""):
+    head = (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nCookie: {cookie}\r\nConnection: keep-alive\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+    writer.write(head.encode() + body)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    status = int(status_line.split()[1])
+    length, chunked, close = 0, False, False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+        elif name.lower() == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+        elif name.lower() == "connection" and "close" in value.lower():
+            close = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(length)
+    return status, close
+
+
+async def run_level(base, cookie, endpoint, concurrency, duration):
+    url = urlsplit(base)
+    method, path, body = endpoint
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    status, close = await request(reader, writer, url.netloc, method, path, cookie, body)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    errors += 1
+                    status, close = None, True
+                else:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if status >= 400:
+                        errors += 1
+                if close:
+                    # Servers without keep-alive pay a reconnect per request
+                    writer.close()
+                    reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sync-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--async-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--slug", required=True, help="A course the user can view")
+    parser.add_argument("--concurrency", default="16,128,512")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint and level")
+    args = parser.parse_args()
+
+    endpoints = {
+        "catalog": ("GET", "/api/courses", b""),
+        "course_detail": ("GET", f"/api/course/{args.slug}", b""),
+        "my_courses": ("GET", "/api/my-courses", b""),
+        "progress": ("POST", f"/progress/{args.slug}", b'{"lesson": 1, "position": 42}'),
+    }
+    targets = {"sync": args.sync_url, "async": args.async_url}
+    cookies = {mode: login(base, args.email, args.password) for mode, base in targets.items()}
+
+    print(f"{'endpoint':<14} {'conc':>5} {'mode':<6} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for name, endpoint in endpoints.items():
+        for concurrency in (int(level) for level in args.concurrency.split(",")):
+            for mode, base in targets.items():
+                latencies, errors, elapsed = asyncio.run(run_level(base, cookies[mode], endpoint, concurrency, args.duration))
+                if not latencies:
+                    print(f"{name:<14} {concurrency:>5} {mode:<6} {'no responses':>9}")
+                    continue
+                print(
+                    f"{name:<14} {concurrency:>5} {mode:<6} {len(latencies) / elapsed:>9.1f} "
+                    f"{statistics.median(latencies):>7.1f}ms {percentile(latencies, 95):>7.1f}ms "
+                    f"{percentile(latencies, 99):>7.1f}ms {errors:>7}"
+                )
+
+
+if __name__ == "__main__":
+    main()
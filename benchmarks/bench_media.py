@@ -0,0 +1,122 @@
+"""Seek latency and concurrent-stream throughput for the /media endpoint.
+
+Run the app under the server you deploy with, then point this at it:
+
+    gunicorn -w 4 'app:app' &
+    python benchmarks/bench_media.py --base-url http://127.0.0.1:8000 --file lecture.mp4 --create-gb 4
+
+--create-gb writes a sparse file of that size into static/videos first, so a
+multi-GB lecture can be simulated without the disk space.
+"""
+import argparse
+import http.client
+import os
+import random
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_sparse_file(path, size):
+    with open(path, "wb") as file:
+        file.truncate(size)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def fetch(base, path, headers=None, read=True):
+    url = urlsplit(base)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+    started = time.perf_counter()
+    conn.request("GET", path, headers=headers or {})
+    response = conn.getresponse()
+    first_byte = time.perf_counter() - started
+    received = 0
+    if read:
+        while True:
+            chunk = response.read(256 * 1024)
+            if not chunk:
+                break
+            received += len(chunk)
+    conn.close()
+    return response, first_byte, time.perf_counter() - started, received
+
+
+def bench_seeks(base, path, size, count, chunk):
+    """Random Range requests, like a viewer scrubbing through the timeline."""
+    latencies = []
+    for _ in range(count):
+        start = random.randrange(0, max(1, size - chunk))
+        response, first_byte, _, received = fetch(base, path, {"Range": f"bytes={start}-{start + chunk - 1}"})
+        assert response.status == 206, response.status
+        assert received == chunk, received
+        latencies.append(first_byte * 1000)
+    return latencies
+
+
+def bench_streams(base, path, size, streams, duration):
+    """`streams` clients each downloading sequential 1 MiB ranges for `duration` seconds."""
+    totals = [0] * streams
+    deadline = time.perf_counter() + duration
+    chunk = 1024 * 1024
+
+    def viewer(index):
+        offset = random.randrange(0, max(1, size - chunk))
+        while time.perf_counter() < deadline:
+            end = min(size, offset + chunk) - 1
+            _, _, _, received = fetch(base, path, {"Range": f"bytes={offset}-{end}"})
+            totals[index] += received
+            offset = 0 if end + 1 >= size else end + 1
+
+    threads = [threading.Thread(target=viewer, args=(i,)) for i in range(streams)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(totals), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--file", default="bench.mp4", help="File name under the media folder")
+    parser.add_argument("--create-gb", type=float, default=0, help="Create a sparse file of this size first")
+    parser.add_argument("--seeks", type=int, default=200)
+    parser.add_argument("--seek-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--streams", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    path = f"/media/{args.file}"
+    if args.create_gb:
+        local = os.path.join(ROOT, "static", "videos", args.file)
+        create_sparse_file(local, int(args.create_gb * 1024 ** 3))
+        print(f"Created sparse {args.create_gb} GB file at {local}")
+
+    response, _, _, _ = fetch(args.base_url, path, read=False)
+    size = int(response.getheader("Content-Length"))
+    print(f"{path}: {size / 1024 ** 3:.2f} GB, ETag {response.getheader('ETag')}")
+
+    latencies = bench_seeks(args.base_url, path, size, args.seeks, args.seek_bytes)
+    print(
+        f"seek ({args.seeks} x {args.seek_bytes // 1024} KiB): "
+        f"p50 {statistics.median(latencies):.2f} ms, p95 {percentile(latencies, 95):.2f} ms, "
+        f"p99 {percentile(latencies, 99):.2f} ms"
+    )
+
+    total, elapsed = bench_streams(args.base_url, path, size, args.streams, args.duration)
+    print(
+        f"{args.streams} concurrent streams for {elapsed:.1f}s: "
+        f"{total / elapsed / 1024 ** 2:.1f} MiB/s total, {total / elapsed / args.streams / 1024 ** 2:.2f} MiB/s per stream"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Index build time and query/autocomplete latency for the course search index.
+
+Builds an in-memory index over synthetic courses (no MongoDB needed):
+
+    python benchmarks/bench_search.py --courses 100000 --queries 2000
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.search import SearchIndex  # noqa: E402
+
+SUBJECTS = ["python", "javascript", "data", "machine", "learning", "web", "design", "cloud", "security",
+            "database", "statistics", "algorithms", "networking", "marketing", "finance", "photography",
+            "music", "writing", "excel", "devops", "kubernetes", "react", "django", "flask", "mongodb"]
+LEVELS = ["introduction", "beginners", "intermediate", "advanced", "masterclass", "bootcamp", "fundamentals"]
+FILLER = ["build", "project", "hands", "practical", "real", "world", "examples", "exercises", "deploy",
+          "analyze", "create", "understand", "modern", "complete", "guide", "skills", "career", "professional"]
+NAMES = ["jane", "john", "alex", "maria", "wei", "priya", "omar", "sofia", "li", "david", "fatima", "ivan"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def make_vocabulary(rng, size):
+    """Pseudo-words with cumulative Zipf-like weights, so a few terms are common and most are rare."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocab = ["".join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(size)]
+    return vocab, list(itertools.accumulate(1 / rank for rank in range(1, size + 1)))
+
+
+def words(rng, pool, count, cum_weights=None):
+    return " ".join(rng.choices(pool, cum_weights=cum_weights, k=count))
+
+
+def synthetic_course(rng, i, vocab, weights):
+    subject = rng.choice(SUBJECTS)
+    fields = {
+        "title": f"{subject} {rng.choice(LEVELS)} {words(rng, vocab, 2, weights)} {i}",
+        "description": f"{words(rng, FILLER, 3)} {words(rng, vocab, 25, weights)}",
+        "instructor_name": f"{rng.choice(NAMES)} {rng.choice(NAMES)}son",
+        "lessons": words(rng, vocab, 30, weights),
+    }
+    return f"course-{i}", fields, {"slug": f"course-{i}", "title": fields["title"]}
+
+
+def timed(fn, inputs):
+    latencies = []
+    for value in inputs:
+        started = time.perf_counter()
+        fn(value)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(label, latencies):
+    print(
+        f"{label:<22} p50 {statistics.median(latencies):7.2f} ms   p95 {percentile(latencies, 95):7.2f} ms   "
+        f"p99 {percentile(latencies, 99):7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab, weights = make_vocabulary(rng, args.vocabulary)
+    docs = [synthetic_course(rng, i, vocab, weights) for i in range(args.courses)]
+
+    index = SearchIndex()
+    started = time.perf_counter()
+    for slug, fields, doc in docs:
+        index.add(slug, fields, doc)
+    build = time.perf_counter() - started
+    print(f"indexed {len(index)} courses in {build:.2f}s ({len(index) / build:,.0f} docs/s)")
+
+    single = [rng.choice(SUBJECTS) for _ in range(args.queries)]
+    multi = [f"{rng.choice(SUBJECTS)} {rng.choice(LEVELS)} {rng.choice(FILLER)}" for _ in range(args.queries)]
+    rare = [f"{rng.choice(vocab)} {rng.choice(vocab)}" for _ in range(args.queries)]
+    prefixes = [rng.choice(vocab)[:rng.randint(1, 4)] for _ in range(args.queries)]
+
+    # The first query after a write rebuilds the length norms
+    index.search(single[0])
+    report("search (1 term)", timed(index.search, single))
+    report("search (3 terms)", timed(index.search, multi))
+    report("search (rare terms)", timed(index.search, rare))
+    report("suggest (prefix)", timed(index.suggest, prefixes))
+
+    started = time.perf_counter()
+    slug, fields, doc = synthetic_course(rng, args.courses, vocab, weights)
+    index.add(slug, fields, doc)
+    print(f"incremental add of one course: {(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Cold-start and worker-recycle time for the app factory.
+
+Each run starts a fresh interpreter and measures the following:
+  - the import of the factory module
+  - create_app()
+  - warm_up()
+  - the first request to a few template-rendering pages, both with and
+    without a preceding warm-up
+  - "recycle": forking a worker from a warmed-up master and serving its first
+    request, which is what gunicorn does with preload_app when a worker is
+    replaced (max_requests, crashes, HUP)
+
+    python benchmarks/bench_startup.py --runs 10
+
+No database is needed: the app is built against mongomock, and warm-up skips index creation.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, os, sys, time, types
+import mongomock  # the stand-in's own import time isn't the app's
+sys.path.insert(0, ROOT)
+t0 = time.perf_counter()
+from factory import create_app, warm_up
+t_import = time.perf_counter()
+
+client = mongomock.MongoClient()
+config = types.SimpleNamespace(
+    SECRET_KEY="bench", MONGODB_URI="mongodb://mongomock", MONGO_CLIENT_FACTORY=lambda uri, **options: client,
+    MAIL_SERVER="localhost", MAIL_PORT=25, MAIL_USE_TLS=False, MAIL_USERNAME=None, MAIL_PASSWORD=None,
+    MAIL_DEFAULT_SENDER="bench@example.com",
+)
+app = create_app(config)
+t_create = time.perf_counter()
+
+timings = {"import_ms": (t_import - t0) * 1000, "create_app_ms": (t_create - t_import) * 1000}
+if WARM:
+    warm_up(app, indexes=False)
+    timings["warm_up_ms"] = (time.perf_counter() - t_create) * 1000
+
+def first_requests():
+    test_client = app.test_client()
+    out = {}
+    for path in PATHS:
+        started = time.perf_counter()
+        response = test_client.get(path)
+        out[path] = (time.perf_counter() - started) * 1000
+        assert response.status_code < 500, (path, response.status_code)
+    return out
+
+if WARM:
+    read_fd, write_fd = os.pipe()
+    forked = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        first = first_requests()
+        os.write(write_fd, json.dumps({"recycle_ms": (time.perf_counter() - forked) * 1000}).encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    timings.update(json.loads(os.read(read_fd, 4096)))
+
+timings["first_request_ms"] = first_requests()
+print(json.dumps(timings))
+"""
+
+PATHS = ["/", "/about", "/auth/login", "/forgot-password"]
+
+
+def run_child(warm):
+    code = f"ROOT = {ROOT!r}\nWARM = {warm!r}\nPATHS = {PATHS!r}\n" + CHILD
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    total = (time.perf_counter() - started) * 1000
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process_ms"] = total
+    return timings
+
+
+def summarize(label, runs):
+    keys = [key for key in runs[0] if key != "first_request_ms"]
+    print(f"\n{label} ({len(runs)} runs, median)")
+    for key in keys:
+        print(f"  {key:<16} {statistics.median(run[key] for run in runs):8.1f} ms")
+    for path in PATHS:
+        print(f"  first GET {path:<16} {statistics.median(run['first_request_ms'][path] for run in runs):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    summarize("cold start, no warm-up", [run_child(False) for _ in range(args.runs)])
+    summarize("cold start, warmed up before serving", [run_child(True) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import os
+import time
+
+from flask import Flask
+
+from utils.commands import register_commands
+from utils.extensions import init_extensions
+
+# Settings that have a default when config.py doesn't define them
+DEFAULTS = {
+    "BCRYPT_LOG_ROUNDS": 12,
+    "MONGODB_DATABASE": "elearn_demo",
+    "MONGO_MAX_POOL_SIZE": 50,
+    "MONGO_MIN_POOL_SIZE": 0,
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": 2000,
+    "MONGO_COMPRESSORS": None,
+    "MONGO_CATALOG_SECONDARY": False,
+    "MONGO_CLIENT_FACTORY": None,
+    "SLOW_REQUEST_MS": 500,
+    "METRICS_TOKEN": None,
+    "ENSURE_INDEXES_ON_STARTUP": False,
+    "RESPONSE_CACHE_BACKEND": "memory",
+    "RESPONSE_CACHE_DIR": None,
+    "RESPONSE_CACHE_TTL": 60,
+    "RESPONSE_CACHE_MAXSIZE": 4096,
+    "MAIL_QUEUE_AUTOSTART": True,
+}
+
+
+def create_app(config=None, **overrides):
+    """Build the Flask app without touching the network or the filesystem.
+
+    `config` is any object with upper-case settings (defaults to the `config`
+    module). Extensions connect lazily, so this is cheap enough to call per
+    test; warm_up() does the expensive one-off work before workers fork.
+    """
+    if config is None:
+        import config
+
+    app = Flask(__name__)
+    app.config.update(DEFAULTS)
+    app.config.from_object(config)
+    app.config.update(overrides)
+    app.config.setdefault("UPLOAD_FOLDER", os.path.join(app.root_path, "static", "uploads"))
+
+    init_extensions(app)
+
+    # Blueprints first: on URLs both define (/courses, /course/<slug>, ...) they win
+    from routes.api_route import api_bp
+    from routes.auth_route import auth_bp
+    from routes.course_route import course_routes
+    from routes.media_route import media_bp
+    from routes.main_route import register_main_routes
+
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(course_routes)
+    app.register_blueprint(media_bp)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    register_main_routes(app)
+    register_commands(app)
+    return app
+
+
+def warm_up(app, indexes=None, search=False):
+    """Do the one-off startup work in the master process, before workers fork.
+
+    Compiles every template, parses data/courses.json and (optionally) applies
+    index migrations and builds the search index, so forked workers share the
+    results copy-on-write instead of each paying for them on its first
+    requests. Retires cached pages rendered by the previous deploy, and closes
+    the Mongo client afterwards so no sockets cross the fork.
+    Returns the seconds spent per step.
+    """
+    from models.indexes import ensure_indexes
+    from utils import search as course_search
+    from utils.course_utils import catalog_file
+
+    timings = {}
+
+    started = time.perf_counter()
+    for name in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(name)
+    timings["templates"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    catalog_file.refresh(force=True)
+    timings["catalog"] = time.perf_counter() - started
+
+    # Templates or assets may have changed since a filesystem cache was filled
+    app.extensions["response_cache"].invalidate()
+
+    if indexes is None:
+        indexes = app.config.get("ENSURE_INDEXES_ON_STARTUP")
+    with app.app_context():
+        if indexes:
+            started = time.perf_counter()
+            ensure_indexes(app.db)
+            timings["indexes"] = time.perf_counter() - started
+        if search:
+            started = time.perf_counter()
+            course_search.get_search_index(app.catalog_db)
+            timings["search"] = time.perf_counter() - started
+
+    app.extensions["mongo"].close()
+    return timings
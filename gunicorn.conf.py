@@ -0,0 +1,20 @@
+# gunicorn -c gunicorn.conf.py app:app
+#
+# The app is imported once in the master and warmed up (templates compiled,
+# course catalog parsed, indexes applied) before any worker forks, so new and
+# recycled workers start serving immediately from copy-on-write memory.
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", os.cpu_count() or 2))
+preload_app = True
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    from app import app
+    from factory import warm_up
+
+    timings = warm_up(app, search=True)
+    server.log.info("warm-up: " + ", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in timings.items()))
@@ -0,0 +1,172 @@
+from bson import ObjectId
+from datetime import datetime, timedelta
+
+from pymongo import ReplaceOne
+
+# ─────────────────────────────────────
+# COURSE STATS ROLLUPS
+# One `course_stats` document per course, keyed by the course _id:
+#   {instructor_id, title, slug, enrollments, completions, active_learners,
+#    daily: {"YYYY-MM-DD": {"enrollments": n, "completions": n}}, daily_pruned_on}
+# Enroll/complete events $inc it; rebuild_course_stats() recomputes it all.
+# `daily` keeps only the last DAILY_RETENTION_DAYS days: the first event of
+# each day drops older entries.
+# ─────────────────────────────────────
+ACTIVE_WINDOW_DAYS = 7
+DAILY_RETENTION_DAYS = 90
+COURSE_FIELDS = {"instructor_id": 1, "title": 1, "slug": 1}
+
+
+def _day(when=None):
+    return (when or datetime.now()).strftime("%Y-%m-%d")
+
+
+def _daily_cutoff():
+    return _day(datetime.now() - timedelta(days=DAILY_RETENTION_DAYS))
+
+
+def init_course_stats(db, course):
+    db.course_stats.update_one(
+        {"_id": course["_id"]},
+        {
+            "$set": {
+                "instructor_id": course["instructor_id"],
+                "title": course["title"],
+                "slug": course["slug"],
+            },
+            "$setOnInsert": {"enrollments": 0, "completions": 0, "active_learners": 0, "daily": {}},
+        },
+        upsert=True,
+    )
+
+
+def record_course_event(db, course_id, enrolled=0, completed=0, when=None):
+    inc = {}
+    day = _day(when)
+    if enrolled:
+        inc["enrollments"] = enrolled
+        inc[f"daily.{day}.enrollments"] = enrolled
+    if completed:
+        inc["completions"] = completed
+        inc[f"daily.{day}.completions"] = completed
+    if not inc:
+        return
+
+    course_id = ObjectId(course_id)
+    before = db.course_stats.find_one_and_update(
+        {"_id": course_id},
+        {"$inc": inc, "$set": {"updated_at": datetime.now()}, "$max": {"daily_pruned_on": day}},
+        projection={"daily_pruned_on": 1},
+        upsert=True,
+    )
+    if before is None:
+        # First event for a course created before course_stats existed
+        copy_course_fields(db, [course_id])
+    elif before.get("daily_pruned_on", "") < day:
+        # First event of the day: drop days that fell out of the window
+        prune_daily(db, course_id)
+
+
+def prune_daily(db, course_id):
+    stats = db.course_stats.find_one({"_id": course_id}, {"daily": 1}) or {}
+    cutoff = _daily_cutoff()
+    expired = [day for day in stats.get("daily", {}) if day < cutoff]
+    if expired:
+        db.course_stats.update_one({"_id": course_id}, {"$unset": {f"daily.{day}": "" for day in expired}})
+    return len(expired)
+
+
+def copy_course_fields(db, course_ids):
+    """Set instructor_id/title/slug on the given rollups from their courses."""
+    updated = 0
+    for course in db.courses.find({"_id": {"$in": list(course_ids)}}, COURSE_FIELDS):
+        db.course_stats.update_one(
+            {"_id": course["_id"]},
+            {"$set": {field: course.get(field) for field in COURSE_FIELDS}},
+        )
+        updated += 1
+    return updated
+
+
+def backfill_course_stats_fields(db):
+    """Fill in rollups that record_course_event() created without instructor fields.
+
+    Without instructor_id they never show up on the instructor dashboard.
+    Returns the number of course_stats documents updated.
+    """
+    ids = [row["_id"] for row in db.course_stats.find({"instructor_id": None}, {"_id": 1})]
+    return copy_course_fields(db, ids) if ids else 0
+
+
+def rebuild_course_stats(db, active_days=ACTIVE_WINDOW_DAYS, batch_size=500):
+    """Recompute every course's rollup from `enrollments` (run on a schedule, e.g. nightly).
+
+    This is the only place active_learners is computed, since it depends on a
+    sliding time window. Returns the number of course_stats documents written.
+    """
+    active_since = datetime.now() - timedelta(days=active_days)
+    totals = {
+        row["_id"]: row
+        for row in db.enrollments.aggregate([
+            {"$group": {
+                "_id": "$course_id",
+                "enrollments": {"$sum": 1},
+                "completions": {"$sum": {"$cond": [{"$eq": ["$completed", True]}, 1, 0]}},
+                "active_learners": {"$sum": {"$cond": [{"$gte": ["$last_activity_at", active_since]}, 1, 0]}},
+            }},
+        ])
+    }
+
+    # Per-day series are streamed from separate cursors rather than a $facet,
+    # which would have to fit every course-day in one 16 MB document
+    daily = {}
+    window_start = datetime.strptime(_daily_cutoff(), "%Y-%m-%d")
+    for field, date_field in (("enrollments", "enrolled_at"), ("completions", "completed_at")):
+        for row in db.enrollments.aggregate([
+            {"$match": {date_field: {"$type": "date", "$gte": window_start}}},
+            {"$group": {
+                "_id": {"course": "$course_id", "day": {"$dateToString": {"format": "%Y-%m-%d", "date": f"${date_field}"}}},
+                "n": {"$sum": 1},
+            }},
+        ]):
+            days = daily.setdefault(row["_id"]["course"], {})
+            days.setdefault(row["_id"]["day"], {})[field] = row["n"]
+
+    now = datetime.now()
+    written = 0
+    writes = []
+    for course in db.courses.find({}, COURSE_FIELDS):
+        row = totals.get(course["_id"], {})
+        writes.append(ReplaceOne({"_id": course["_id"]}, {
+            "instructor_id": course.get("instructor_id"),
+            "title": course.get("title"),
+            "slug": course.get("slug"),
+            "enrollments": row.get("enrollments", 0),
+            "completions": row.get("completions", 0),
+            "active_learners": row.get("active_learners", 0),
+            "daily": daily.get(course["_id"], {}),
+            "updated_at": now,
+            "rebuilt_at": now,
+            "daily_pruned_on": _day(now),
+        }, upsert=True))
+        if len(writes) >= batch_size:
+            db.course_stats.bulk_write(writes, ordered=False)
+            written += len(writes)
+            writes = []
+    if writes:
+        db.course_stats.bulk_write(writes, ordered=False)
+        written += len(writes)
+    return written
+
+
+def get_instructor_stats(db, instructor_id, days=14):
+    """All of an instructor's course rollups in one indexed read, with a `recent` per-day series."""
+    stats = list(db.course_stats.find({"instructor_id": ObjectId(instructor_id)}).sort("title", 1))
+    today = datetime.now()
+    window = [_day(today - timedelta(days=offset)) for offset in range(days - 1, -1, -1)]
+    for course in stats:
+        course_daily = course.get("daily", {})
+        course["recent"] = [(day, course_daily.get(day, {}).get("enrollments", 0)) for day in window]
+        enrollments = course.get("enrollments", 0)
+        course["completion_rate"] = course.get("completions", 0) / enrollments if enrollments else 0.0
+    return stats
@@ -1,5 +1,10 @@
+import re
+import unicodedata
+
 from bson import ObjectId
+from bson.errors import InvalidId
 from datetime import datetime
+from pymongo.errors import DuplicateKeyError
 
 def create_course(db, title, description, instructor_id, image):
     # Fetch instructor details from users collection
@@ -16,9 +21,164 @@ def create_course(db, title, description, instructor_id, image):
         "instructor_id": ObjectId(instructor_id),
         "instructor_name": instructor_name,  # ✅ Save instructor name directly
         "image": image,
-        "slug": title.lower().replace(" ", "-"),
-        "students": [],
+        "enrollment_count": 0,
+        "completed_count": 0,
         "created_at": datetime.now()
     }
 
-    return db.courses.insert_one(course)
\ No newline at end of file
+    return insert_course(db, course)
+
+# ─────────────────────────────────────
+# SLUGS
+# ─────────────────────────────────────
+SLUG_ATTEMPTS = 5
+
+
+def slugify(title):
+    """URL- and filename-safe slug: "C++ / Intro?" -> "c-intro"."""
+    ascii_title = unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_title.lower()).strip("-") or "course"
+
+
+def insert_course(db, course):
+    """Insert `course` under the first free slug for its title ("python", "python-2", ...).
+
+    Sets course["slug"]. Retries when a concurrent insert takes the slug
+    first, and re-raises DuplicateKeyError after SLUG_ATTEMPTS collisions.
+    """
+    base = slugify(course["title"])
+    pattern = f"^{re.escape(base)}(-[0-9]+)?$"
+    taken = {doc["slug"] for doc in db.courses.find({"slug": {"$regex": pattern}}, {"slug": 1})}
+
+    suffix = 1
+    for attempt in range(SLUG_ATTEMPTS):
+        while (base if suffix == 1 else f"{base}-{suffix}") in taken:
+            suffix += 1
+        course["slug"] = base if suffix == 1 else f"{base}-{suffix}"
+        try:
+            return db.courses.insert_one(course)
+        except DuplicateKeyError:
+            if attempt == SLUG_ATTEMPTS - 1:
+                raise
+            taken.add(course["slug"])
+
+# ─────────────────────────────────────
+# CATALOG PAGINATION
+# ─────────────────────────────────────
+DEFAULT_PAGE_SIZE = 12
+MAX_PAGE_SIZE = 48
+
+# Fields the catalog cards actually render; leaves out any legacy `students` roster
+CATALOG_PROJECTION = {
+    "title": 1,
+    "description": 1,
+    "instructor_id": 1,
+    "instructor_name": 1,
+    "image": 1,
+    "image_variants": 1,
+    "slug": 1,
+    "created_at": 1,
+    "enrollment_count": 1,
+}
+
+
+def get_enrollment_counts(db, course_ids):
+    """Current enrollment_count per course _id.
+
+    Cached catalog pages and search results carry the count from when they
+    were built; enroll() doesn't retire them, so views read it live.
+    """
+    course_ids = [course_id for course_id in course_ids if course_id]
+    if not course_ids:
+        return {}
+    return {
+        course["_id"]: course.get("enrollment_count", 0)
+        for course in db.courses.find({"_id": {"$in": course_ids}}, {"enrollment_count": 1})
+    }
+
+
+def clamp_page_size(page_size):
+    try:
+        page_size = int(page_size)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def course_created_at(course):
+    """created_at, or for legacy documents without one, when their ObjectId was generated.
+
+    Index migration 6 stores the same fallback on those documents, so
+    cursors encoded from it match what the keyset query compares against.
+    """
+    if course.get("created_at"):
+        return course["created_at"]
+    if not isinstance(course.get("_id"), ObjectId):
+        return datetime.fromtimestamp(0)
+    # Naive local time, like the datetime.now() written for new courses
+    return course["_id"].generation_time.astimezone().replace(tzinfo=None)
+
+
+def encode_cursor(course):
+    return f"{int(course_created_at(course).timestamp() * 1000)}_{course['_id']}"
+
+
+def decode_cursor(cursor):
+    try:
+        millis, course_id = cursor.split("_", 1)
+        return datetime.fromtimestamp(int(millis) / 1000), ObjectId(course_id)
+    except (AttributeError, ValueError, TypeError, InvalidId):
+        return None
+
+
+def course_page_query(cursor=None, direction="next"):
+    """The filter and sort for one keyset catalog page, plus the decoded position.
+
+    Split out from get_course_page() so the async API can run the same query.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    backwards = position is not None and direction == "prev"
+
+    query = {}
+    if position:
+        created_at, course_id = position
+        op = "$gt" if backwards else "$lt"
+        query = {"$or": [
+            {"created_at": {op: created_at}},
+            {"created_at": created_at, "_id": {op: course_id}},
+        ]}
+
+    order = 1 if backwards else -1
+    return query, [("created_at", order), ("_id", order)], position, backwards
+
+
+def build_course_page(courses, page_size, position, backwards):
+    """Turn the page_size + 1 documents fetched by course_page_query() into a page dict."""
+    has_more = len(courses) > page_size
+    courses = courses[:page_size]
+    if backwards:
+        courses.reverse()
+
+    if backwards:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, position is not None
+
+    return {
+        "courses": courses,
+        "next_cursor": encode_cursor(courses[-1]) if courses and has_next else None,
+        "prev_cursor": encode_cursor(courses[0]) if courses and has_prev else None,
+        "page_size": page_size,
+    }
+
+
+def get_course_page(db, cursor=None, direction="next", page_size=DEFAULT_PAGE_SIZE):
+    """Return one catalog page, newest first, using keyset paging on (created_at, _id).
+
+    `cursor` comes from a previous page's `next_cursor`/`prev_cursor`; `direction`
+    says which way to walk from it.
+    """
+    page_size = clamp_page_size(page_size)
+    query, sort, position, backwards = course_page_query(cursor, direction)
+    courses = list(db.courses.find(query, CATALOG_PROJECTION).sort(sort).limit(page_size + 1))
+    return build_course_page(courses, page_size, position, backwards)
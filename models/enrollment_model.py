@@ -1,28 +1,323 @@
 # models/enrollment_model.py
+import csv
+import json
+import time
 from bson import ObjectId
 from datetime import datetime
+from itertools import islice
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from models.analytics_model import record_course_event
+from utils.cache import course_cache, invalidate_course
 
 def enroll_student(db, student_id, course_id):
-    existing = db.enrollments.find_one({
-        "student_id": ObjectId(student_id),
-        "course_id": ObjectId(course_id)
-    })
-    if existing:
-        return False  # Already enrolled
-
-    db.enrollments.insert_one({
-    "student_id": ObjectId(student_id),  # ✅ convert to ObjectId
-    "course_id": ObjectId(course_id),
-    "completed": False,
-    "enrolled_at": datetime.now()
-})
-
-    # Optional: add student to course's "students" array
-    db.courses.update_one(
-        {"_id": ObjectId(course_id)},
-        {"$addToSet": {"students": ObjectId(student_id)}}
+    """Enroll a student with a single upsert on the (student_id, course_id) key.
+
+    Returns True only for the request that created the enrollment, so double
+    submits report "already enrolled". New enrollments bump the course's
+    `enrollment_count`; the course document no longer carries a roster.
+    """
+    student_id = ObjectId(student_id)
+    course_id = ObjectId(course_id)
+    now = datetime.now()
+    try:
+        result = db.enrollments.update_one(
+            {"student_id": student_id, "course_id": course_id},
+            {"$setOnInsert": {"completed": False, "enrolled_at": now, "last_activity_at": now}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return False  # A concurrent request inserted it first
+
+    created = result.upserted_id is not None
+    if created:
+        increment_course_counters(db, course_id, enrolled=1)
+    return created
+
+
+def complete_enrollment(db, student_id, course_id):
+    """Mark an enrollment completed; returns True only on the first completion."""
+    course_id = ObjectId(course_id)
+    now = datetime.now()
+    result = db.enrollments.update_one(
+        {"student_id": ObjectId(student_id), "course_id": course_id, "completed": {"$ne": True}},
+        {"$set": {"completed": True, "status": "completed", "completed_at": now, "last_activity_at": now}},
     )
-    return True
+    if result.modified_count:
+        increment_course_counters(db, course_id, completed=1)
+        return True
+    return False
+
+
+# ─────────────────────────────────────
+# COURSE COUNTERS
+# ─────────────────────────────────────
+def increment_course_counters(db, course_id, enrolled=0, completed=0):
+    inc = {}
+    if enrolled:
+        inc["enrollment_count"] = enrolled
+    if completed:
+        inc["completed_count"] = completed
+    if inc:
+        db.courses.update_one({"_id": ObjectId(course_id)}, {"$inc": inc})
+        invalidate_course(course_id=course_id)
+        record_course_event(db, course_id, enrolled=enrolled, completed=completed)
+
+
+def backfill_course_counters(db, batch_size=500):
+    """One-shot migration: recount every course from `enrollments` and drop the roster array.
+
+    Safe to re-run; counters are $set from the aggregation, not incremented.
+    """
+    totals = {
+        row["_id"]: row
+        for row in db.enrollments.aggregate([
+            {"$group": {
+                "_id": "$course_id",
+                "enrollment_count": {"$sum": 1},
+                "completed_count": {"$sum": {"$cond": [{"$eq": ["$completed", True]}, 1, 0]}},
+            }},
+        ])
+    }
+
+    updated = 0
+    batch = []
+    for course in db.courses.find({}, {"_id": 1}):
+        row = totals.get(course["_id"], {})
+        batch.append(UpdateOne(
+            {"_id": course["_id"]},
+            {
+                "$set": {
+                    "enrollment_count": row.get("enrollment_count", 0),
+                    "completed_count": row.get("completed_count", 0),
+                },
+                "$unset": {"students": ""},
+            },
+        ))
+        if len(batch) >= batch_size:
+            updated += db.courses.bulk_write(batch, ordered=False).matched_count
+            batch = []
+    if batch:
+        updated += db.courses.bulk_write(batch, ordered=False).matched_count
+    course_cache.clear()
+    return updated
+
+
+# ─────────────────────────────────────
+# BULK ENROLLMENT
+# ─────────────────────────────────────
+BULK_CHUNK_SIZE = 1000
+
+
+def iter_student_emails(stream, fmt="csv"):
+    """Yield normalized emails from a CSV or JSONL text stream, one row at a time.
+
+    CSV uses an `email` column when the header has one, otherwise the first column.
+    JSONL lines may be objects with an `email` key or bare strings.
+    """
+    if fmt == "jsonl":
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            email = row.get("email") if isinstance(row, dict) else row
+            if isinstance(email, str) and email.strip():
+                yield email.strip().lower()
+        return
+
+    reader = csv.reader(stream)
+    column = 0
+    for row in reader:
+        if not row:
+            continue
+        if reader.line_num == 1:
+            header = [cell.strip().lower() for cell in row]
+            if "email" in header:
+                column = header.index("email")
+                continue
+        if column < len(row) and "@" in row[column]:
+            yield row[column].strip().lower()
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_enroll_students(db, course_slug, emails, chunk_size=BULK_CHUNK_SIZE):
+    """Enroll a stream of student emails into one course.
+
+    Emails are resolved to user IDs with one `$in` query per chunk and written
+    with one unordered bulk_write per chunk, so memory stays bounded by
+    chunk_size no matter how long the input is.
+    """
+    course = db.courses.find_one({"slug": course_slug}, {"_id": 1})
+    if not course:
+        raise ValueError(f"Course '{course_slug}' not found")
+    course_id = course["_id"]
+
+    stats = {"rows": 0, "inserted": 0, "duplicates": 0, "unknown": 0}
+    started = time.perf_counter()
+
+    for chunk in _chunks(emails, chunk_size):
+        stats["rows"] += len(chunk)
+        unique_emails = set(chunk)
+        stats["duplicates"] += len(chunk) - len(unique_emails)
+
+        users = db.users.find({"email": {"$in": list(unique_emails)}}, {"_id": 1})
+        student_ids = [user["_id"] for user in users]
+        stats["unknown"] += len(unique_emails) - len(student_ids)
+        if not student_ids:
+            continue
+
+        now = datetime.now()
+        requests = [
+            UpdateOne(
+                {"student_id": student_id, "course_id": course_id},
+                {"$setOnInsert": {"completed": False, "enrolled_at": now, "last_activity_at": now}},
+                upsert=True,
+            )
+            for student_id in student_ids
+        ]
+        try:
+            result = db.enrollments.bulk_write(requests, ordered=False)
+            inserted = result.upserted_count
+        except BulkWriteError as exc:
+            # Duplicate-key errors mean a concurrent enroll got there first
+            if any(error.get("code") != 11000 for error in exc.details.get("writeErrors", [])):
+                raise
+            inserted = exc.details.get("nUpserted", 0)
+        stats["inserted"] += inserted
+        stats["duplicates"] += len(student_ids) - inserted
+        increment_course_counters(db, course_id, enrolled=inserted)
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
 
 def get_enrollments_by_course(db, course_id):
-    return list(db.enrollments.find({"course_id": ObjectId(course_id)}))
\ No newline at end of file
+    return list(db.enrollments.find({"course_id": ObjectId(course_id)}))
+
+
+# ─────────────────────────────────────
+# ENROLLED STUDENTS (server-side join)
+# ─────────────────────────────────────
+def enrolled_students_pipeline(course_id, skip=0, limit=None):
+    """Join a course's enrollments to users in MongoDB, returning only display fields.
+
+    Paging happens before the $lookup so only one page of users is joined, and
+    the lookup projects away everything but name and email (no password hashes).
+    """
+    pipeline = [
+        {"$match": {"course_id": ObjectId(course_id)}},
+        {"$sort": {"enrolled_at": 1, "_id": 1}},
+    ]
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline += [
+        {"$lookup": {
+            "from": "users",
+            "localField": "student_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"_id": 0, "first_name": 1, "last_name": 1, "email": 1}}],
+            "as": "student",
+        }},
+        {"$unwind": "$student"},
+        {"$project": {
+            "_id": 0,
+            "full_name": {"$trim": {"input": {"$concat": [
+                {"$ifNull": ["$student.first_name", ""]}, " ", {"$ifNull": ["$student.last_name", ""]},
+            ]}}},
+            "email": {"$ifNull": ["$student.email", "N/A"]},
+            "enrolled_at": 1,
+            "completed": 1,
+        }},
+    ]
+    return pipeline
+
+
+def get_enrolled_students_page(db, course_id, page=1, per_page=50, lookahead=0):
+    skip = (page - 1) * per_page
+    return list(db.enrollments.aggregate(enrolled_students_pipeline(course_id, skip, per_page + lookahead)))
+
+
+def iter_enrolled_students(db, course_id, batch_size=1000):
+    """Cursor over every enrolled student of a course, fetched batch_size rows at a time."""
+    return db.enrollments.aggregate(enrolled_students_pipeline(course_id), batchSize=batch_size)
+
+
+
+# ─────────────────────────────────────
+# STUDENT COURSES (server-side join)
+# ─────────────────────────────────────
+STUDENT_COURSE_SORTS = {
+    "activity": "last_activity_at",
+    "enrolled": "enrolled_at",
+}
+
+
+def student_courses_pipeline(student_id, page=1, per_page=None, sort="activity", lookahead=0):
+    sort_field = STUDENT_COURSE_SORTS.get(sort, STUDENT_COURSE_SORTS["activity"])
+    pipeline = [
+        {"$match": {"student_id": ObjectId(student_id)}},
+        {"$sort": {sort_field: -1, "_id": -1}},
+    ]
+    if per_page:
+        pipeline += [{"$skip": (page - 1) * per_page}, {"$limit": per_page + lookahead}]
+    pipeline += [
+        {"$lookup": {
+            "from": "courses",
+            "localField": "course_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"_id": 0, "title": 1, "description": 1, "slug": 1}}],
+            "as": "course",
+        }},
+        {"$unwind": "$course"},
+        {"$project": {
+            "_id": 0,
+            "course_id": 1,
+            "title": "$course.title",
+            "description": "$course.description",
+            "slug": {"$ifNull": ["$course.slug", ""]},
+            "completed": {"$ifNull": ["$completed", False]},
+            "last_activity_at": 1,
+        }},
+    ]
+    return pipeline
+
+
+def get_student_courses(db, student_id, page=1, per_page=None, sort="activity", lookahead=0):
+    """A student's enrolled courses in one aggregation, most recently active first.
+
+    Returns flat dicts with just what my_courses.html renders: title,
+    description, slug and completed. `lookahead` extra rows past the page
+    tell the caller whether a next page exists.
+    """
+    return list(db.enrollments.aggregate(student_courses_pipeline(student_id, page, per_page, sort, lookahead)))
+
+
+def student_course_totals_pipeline(student_id):
+    return [
+        {"$match": {"student_id": ObjectId(student_id)}},
+        {"$group": {
+            "_id": None,
+            "enrolled": {"$sum": 1},
+            "completed": {"$sum": {"$cond": [{"$eq": ["$completed", True]}, 1, 0]}},
+        }},
+    ]
+
+
+def get_student_course_totals(db, student_id):
+    """How many courses a student is enrolled in and has completed."""
+    rows = list(db.enrollments.aggregate(student_course_totals_pipeline(student_id)))
+    return {"enrolled": rows[0]["enrolled"], "completed": rows[0]["completed"]} if rows else {"enrolled": 0, "completed": 0}
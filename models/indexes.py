@@ -0,0 +1,271 @@
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from models.analytics_model import backfill_course_stats_fields
+from models.course_model import course_created_at
+
+# ─────────────────────────────────────
+# INDEX MIGRATIONS
+# Each entry is (version, description, {collection: [IndexModel, ...]}).
+# Append new versions at the end; never edit one that has shipped.
+# ─────────────────────────────────────
+INDEX_MIGRATIONS = [
+    (1, "Lookup indexes for login, course pages and enrollments", {
+        "users": [
+            IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        ],
+        "courses": [
+            IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+            IndexModel([("instructor_id", ASCENDING)], name="instructor_id"),
+        ],
+        "enrollments": [
+            IndexModel(
+                [("student_id", ASCENDING), ("course_id", ASCENDING)],
+                name="student_course_unique",
+                unique=True,
+            ),
+        ],
+    }),
+    (2, "Catalog keyset pagination and per-course enrollment listing", {
+        "courses": [
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        ],
+        "enrollments": [
+            IndexModel([("course_id", ASCENDING), ("enrolled_at", ASCENDING)], name="course_enrolled_at"),
+        ],
+    }),
+    (3, "My-courses listing sorted by last activity", {
+        "enrollments": [
+            IndexModel([("student_id", ASCENDING), ("last_activity_at", DESCENDING)], name="student_last_activity"),
+        ],
+    }),
+    (4, "Mail outbox polling", {
+        "mail_outbox": [
+            IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt"),
+        ],
+    }),
+    (5, "Instructor dashboard rollups", {
+        "course_stats": [
+            IndexModel([("instructor_id", ASCENDING), ("title", ASCENDING)], name="instructor_title"),
+        ],
+    }),
+    (6, "Backfill courses.created_at for catalog keyset pagination", {}),
+    (7, "Backfill instructor fields on course_stats created by enroll events", {}),
+]
+
+MIGRATION_STATE_ID = "indexes"
+
+
+class IndexMigrationError(RuntimeError):
+    """An index migration can't be applied to the data as it stands."""
+
+
+# ─────────────────────────────────────
+# DATA FIXES
+# Run before a version's indexes are built, so documents written before an
+# index existed can't make it fail halfway. Each fix must be safe to re-run.
+# ─────────────────────────────────────
+def find_duplicates(collection, fields, limit=20):
+    """Up to `limit` key values shared by more than one document, with their counts."""
+    return [
+        dict(row["_id"], count=row["count"])
+        for row in collection.aggregate([
+            {"$group": {"_id": {field: f"${field}" for field in fields}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$sort": {"count": DESCENDING}},
+            {"$limit": limit},
+        ], allowDiskUse=True)
+    ]
+
+
+def _merge_enrollments(docs):
+    # Keep everything any copy recorded: earliest enrollment, any completion,
+    # every completed lesson, and the most recent resume point
+    merged = {"completed": any(doc.get("completed") for doc in docs)}
+    for field in ("enrolled_at", "completed_at"):
+        values = [doc[field] for doc in docs if doc.get(field)]
+        if values:
+            merged[field] = min(values)
+    if merged["completed"]:
+        merged["status"] = "completed"
+
+    progress = []
+    for doc in docs:
+        for lesson in doc.get("progress") or []:
+            if lesson not in progress:
+                progress.append(lesson)
+    if progress:
+        merged["progress"] = progress
+
+    active = [doc for doc in docs if doc.get("last_activity_at")]
+    if active:
+        latest = max(active, key=lambda doc: doc["last_activity_at"])
+        for field in ("last_activity_at", "last_lesson", "last_position"):
+            if field in latest:
+                merged[field] = latest[field]
+    return merged
+
+
+def dedupe_enrollments(db):
+    """Collapse duplicate (student_id, course_id) enrollments into the oldest copy.
+
+    Progress and completion from every copy are merged into the one kept, and
+    the affected courses' counters are recounted. Returns the number of
+    documents removed.
+    """
+    removed = 0
+    course_ids = set()
+    for group in db.enrollments.aggregate([
+        {"$group": {
+            "_id": {"student_id": "$student_id", "course_id": "$course_id"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True):
+        docs = list(db.enrollments.find({"_id": {"$in": group["ids"]}}).sort([("enrolled_at", ASCENDING), ("_id", ASCENDING)]))
+        keep, extra = docs[0], docs[1:]
+        db.enrollments.update_one({"_id": keep["_id"]}, {"$set": _merge_enrollments(docs)})
+        db.enrollments.delete_many({"_id": {"$in": [doc["_id"] for doc in extra]}})
+        removed += len(extra)
+        course_ids.add(group["_id"].get("course_id"))
+
+    for course_id in course_ids:
+        db.courses.update_one({"_id": course_id}, {"$set": {
+            "enrollment_count": db.enrollments.count_documents({"course_id": course_id}),
+            "completed_count": db.enrollments.count_documents({"course_id": course_id, "completed": True}),
+        }})
+    if removed:
+        print(f"✅ Merged {removed} duplicate enrollments across {len(course_ids)} courses")
+    return removed
+
+
+def backfill_course_created_at(db):
+    """Give courses saved without created_at the time their _id was generated.
+
+    Keyset paging compares created_at, so a missing value would never match
+    the cursor encoded for it. Returns the number of courses updated.
+    """
+    updated = 0
+    for course in db.courses.find({"created_at": None}, {"_id": 1}):
+        if isinstance(course["_id"], ObjectId):
+            result = db.courses.update_one(
+                {"_id": course["_id"], "created_at": None},
+                {"$set": {"created_at": course_created_at(course)}},
+            )
+            updated += result.modified_count
+    return updated
+
+
+# Keyed by the migration version they must run before
+DATA_FIXES = {
+    1: [dedupe_enrollments],
+    6: [backfill_course_created_at],
+    7: [backfill_course_stats_fields],
+}
+
+
+def get_index_version(db):
+    state = db.schema_migrations.find_one({"_id": MIGRATION_STATE_ID})
+    return state["version"] if state else 0
+
+
+def _check_unique(db, version, collection, indexes):
+    for index in indexes:
+        spec = index.document
+        if not spec.get("unique"):
+            continue
+        duplicates = find_duplicates(db[collection], list(spec["key"]))
+        if duplicates:
+            keys = "; ".join(
+                ", ".join(f"{field}={row.get(field)!r}" for field in spec["key"]) + f" ({row['count']} documents)"
+                for row in duplicates
+            )
+            raise IndexMigrationError(
+                f"Index migration {version} can't build unique index {collection}.{spec['name']}: "
+                f"duplicate keys {keys}. Resolve them and run `flask init-indexes` again."
+            )
+
+
+def ensure_indexes(db):
+    """Apply every index migration newer than the recorded version.
+
+    Safe to call on each startup: already-applied versions are skipped and
+    create_indexes() is a no-op for indexes that already exist.
+    Raises IndexMigrationError, naming the offending keys, when existing
+    documents would break a unique index; later versions are left unapplied.
+    Returns the list of versions applied by this call.
+    """
+    current = get_index_version(db)
+    applied = []
+    for version, description, collections in INDEX_MIGRATIONS:
+        if version <= current:
+            continue
+        for fix in DATA_FIXES.get(version, []):
+            fix(db)
+        for collection, indexes in collections.items():
+            _check_unique(db, version, collection, indexes)
+            try:
+                db[collection].create_indexes(indexes)
+            except OperationFailure as e:
+                # e.g. a duplicate written between the check and the build
+                raise IndexMigrationError(f"Index migration {version} failed on {collection}: {e.details or e}") from e
+        db.schema_migrations.update_one(
+            {"_id": MIGRATION_STATE_ID},
+            {"$set": {"version": version, "description": description, "applied_at": datetime.now()}},
+            upsert=True,
+        )
+        applied.append(version)
+    return applied
+
+
+# ─────────────────────────────────────
+# QUERY PLAN REPORT
+# ─────────────────────────────────────
+def hot_queries():
+    """The lookups made on every login, course view and enroll click."""
+    sample_id = ObjectId()
+    return [
+        ("login: users by email", "users", {"email": "someone@example.com"}, None),
+        ("course page: courses by slug", "courses", {"slug": "python-for-beginners"}, None),
+        ("instructor dashboard: courses by instructor", "courses", {"instructor_id": sample_id}, None),
+        ("enroll: enrollment by student and course", "enrollments",
+         {"student_id": sample_id, "course_id": sample_id}, None),
+        ("my courses: enrollments by student", "enrollments", {"student_id": sample_id}, None),
+        ("catalog: newest courses", "courses", {}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ]
+
+
+def _plan_stages(plan):
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(_plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return [stage for stage in stages if stage]
+
+
+def explain_hot_queries(db):
+    """Run explain() on each hot query and report the winning plan's stages.
+
+    A row with `collscan: True` means the query is not covered by an index.
+    """
+    report = []
+    for label, collection, query, sort in hot_queries():
+        cursor = db[collection].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = cursor.explain()
+        winning = explanation.get("queryPlanner", {}).get("winningPlan", {})
+        stages = _plan_stages(winning)
+        report.append({
+            "query": label,
+            "collection": collection,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return report
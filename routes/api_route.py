@@ -0,0 +1,103 @@
+from datetime import datetime
+
+from bson import ObjectId
+from flask import Blueprint, current_app, jsonify, request, session
+
+from models.course_model import get_course_page
+from models.enrollment_model import get_student_courses, get_student_course_totals
+from utils.cache import get_course_by_slug
+from utils.course_utils import get_catalog_course
+from utils.decorators import api_login_required
+from utils.enrollment_membership import get_enrolled_course_ids
+
+# ─────────────────────────────────────
+# JSON API
+# Same data as the catalog, course and my-courses pages, for JS/mobile
+# clients. asgi.py serves these URLs with async handlers (routes/async_api.py)
+# that return identical payloads; these are the synchronous versions.
+# ─────────────────────────────────────
+api_bp = Blueprint("api", __name__)
+
+API_MY_COURSES_PER_PAGE = 20
+
+
+def to_json(value):
+    """Recursively make Mongo documents JSON-safe (ObjectId -> str, datetime -> ISO 8601)."""
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_json(item) for item in value]
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def catalog_payload(page, enrolled_ids):
+    return to_json({
+        "courses": [dict(course, enrolled=course["_id"] in enrolled_ids) for course in page["courses"]],
+        "next_cursor": page["next_cursor"],
+        "prev_cursor": page["prev_cursor"],
+        "page_size": page["page_size"],
+    })
+
+
+def course_payload(course, enrolled):
+    catalog_entry = get_catalog_course(course["slug"]) or {}
+    return to_json({
+        "course": course,
+        "lessons": [{"title": lesson.get("title"), "video_url": lesson.get("video_url")}
+                    for lesson in catalog_entry.get("lessons", [])],
+        "enrolled": enrolled,
+    })
+
+
+def my_courses_payload(rows, page, per_page, totals):
+    return to_json({
+        "courses": rows[:per_page],
+        "page": page,
+        "has_next": len(rows) > per_page,
+        "totals": totals,
+    })
+
+
+def page_number(value):
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
+
+
+@api_bp.route("/courses")
+@api_login_required
+def courses():
+    page = get_course_page(
+        current_app.catalog_db,
+        cursor=request.args.get("cursor"),
+        direction=request.args.get("dir", "next"),
+        page_size=request.args.get("per_page"),
+    )
+    enrolled_ids = get_enrolled_course_ids(current_app.db, session.get("user_id"))
+    return jsonify(catalog_payload(page, enrolled_ids))
+
+
+@api_bp.route("/course/<slug>")
+@api_login_required
+def course_detail(slug):
+    course = get_course_by_slug(current_app.db, slug)
+    if not course:
+        return jsonify(error="Course not found"), 404
+    enrolled_ids = get_enrolled_course_ids(current_app.db, session.get("user_id"))
+    return jsonify(course_payload(course, course["_id"] in enrolled_ids))
+
+
+@api_bp.route("/my-courses")
+@api_login_required
+def my_courses():
+    page = page_number(request.args.get("page"))
+    sort = request.args.get("sort", "activity")
+    user_id = session.get("user_id")
+    rows = get_student_courses(current_app.db, user_id, page, API_MY_COURSES_PER_PAGE, sort, lookahead=1)
+    totals = get_student_course_totals(current_app.db, user_id)
+    return jsonify(my_courses_payload(rows, page, API_MY_COURSES_PER_PAGE, totals))
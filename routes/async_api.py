@@ -0,0 +1,79 @@
+import asyncio
+
+from bson import ObjectId
+
+from models.course_model import CATALOG_PROJECTION, build_course_page, clamp_page_size, course_page_query
+from models.enrollment_model import student_course_totals_pipeline, student_courses_pipeline
+from routes.api_route import API_MY_COURSES_PER_PAGE, catalog_payload, course_payload, my_courses_payload, page_number
+from utils.asgi import AsyncRouter, JSONResponse, error
+from utils.cache import get_course_by_slug_async
+from utils.db import mongo
+from utils.progress import parse_heartbeat, progress_buffer
+
+# ─────────────────────────────────────
+# ASYNC JSON API (served by asgi.py)
+# The same URLs and payloads as routes/api_route.py plus POST /progress/<slug>,
+# on PyMongo's asyncio driver. Queries that don't depend on each other run
+# concurrently with asyncio.gather, so a request waits for the slowest of
+# them rather than their sum, and a worker serves many requests while they wait.
+# ─────────────────────────────────────
+router = AsyncRouter()
+
+
+async def enrolled_course_ids(db, user):
+    cursor = db.enrollments.find({"student_id": user["_id"]}, {"_id": 0, "course_id": 1})
+    return frozenset([row["course_id"] async for row in cursor])
+
+
+@router.route("/api/courses")
+async def courses(request, user):
+    catalog_db = mongo.get_async_catalog_db()
+    page_size = clamp_page_size(request.args.get("per_page"))
+    query, sort, position, backwards = course_page_query(request.args.get("cursor"), request.args.get("dir", "next"))
+
+    docs, enrolled_ids = await asyncio.gather(
+        catalog_db.courses.find(query, CATALOG_PROJECTION).sort(sort).limit(page_size + 1).to_list(),
+        enrolled_course_ids(mongo.get_async_db(), user),
+    )
+    return catalog_payload(build_course_page(docs, page_size, position, backwards), enrolled_ids)
+
+
+@router.route("/api/course/<slug>")
+async def course_detail(request, user, slug):
+    db = mongo.get_async_db()
+    course, enrolled_ids = await asyncio.gather(
+        get_course_by_slug_async(db, slug),
+        enrolled_course_ids(db, user),
+    )
+    if not course:
+        return error(404, "Course not found")
+    return course_payload(course, course["_id"] in enrolled_ids)
+
+
+@router.route("/api/my-courses")
+async def my_courses(request, user):
+    db = mongo.get_async_db()
+    page = page_number(request.args.get("page"))
+    pipeline = student_courses_pipeline(user["_id"], page, API_MY_COURSES_PER_PAGE, request.args.get("sort", "activity"), 1)
+
+    async def aggregate(pipeline):
+        return await (await db.enrollments.aggregate(pipeline)).to_list()
+
+    rows, totals = await asyncio.gather(aggregate(pipeline), aggregate(student_course_totals_pipeline(user["_id"])))
+    totals = {"enrolled": totals[0]["enrolled"], "completed": totals[0]["completed"]} if totals else {"enrolled": 0, "completed": 0}
+    return my_courses_payload(rows, page, API_MY_COURSES_PER_PAGE, totals)
+
+
+@router.route("/progress/<slug>", methods=("POST",))
+async def record_progress(request, user, slug):
+    course = await get_course_by_slug_async(mongo.get_async_db(), slug)
+    if not course:
+        return error(404, "Course not found")
+
+    heartbeat, message = parse_heartbeat(request.get_json() or {})
+    if message:
+        return error(400, message)
+
+    # In-memory and non-blocking; the buffer's own thread does the bulk write
+    progress_buffer.record(user["_id"], ObjectId(course["_id"]), **heartbeat)
+    return JSONResponse({"status": "queued"}, 202)
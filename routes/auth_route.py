@@ -1,17 +1,19 @@
 from flask import Blueprint, request, jsonify, session, redirect, url_for, flash, render_template, current_app
 
 from models.user_model import find_user_by_email, create_user, get_user_by_id
+from utils.passwords import PasswordHasherBusy
+from utils.identity import login_user, logout_user
 
 auth_bp = Blueprint("auth", __name__, template_folder="../templates")
 
 # ─────────────────────────────────────
-# Helpers to get db and bcrypt from app
+# Helpers to get db and the password hasher from app
 # ─────────────────────────────────────
 def get_db():
     return current_app.db
 
-def get_bcrypt():
-    return current_app.bcrypt
+def get_hasher():
+    return current_app.password_hasher
 
 # ─────────────────────────────────────
 # REGISTER
@@ -53,8 +55,12 @@ def register():
         flash("Password must be at least 6 characters", "warning")
         return redirect(url_for("auth.register"))
 
-    # Hash password
-    pw_hash = get_bcrypt().generate_password_hash(password).decode()
+    # Hash password (off the request thread, in the hashing pool)
+    try:
+        pw_hash = get_hasher().hash(password)
+    except PasswordHasherBusy:
+        flash("The server is busy. Please try again in a moment.", "warning")
+        return redirect(url_for("auth.register"))
 
     # Save user
     user_id = create_user(get_db(), first_name, last_name, email, pw_hash, role)
@@ -75,23 +81,22 @@ def login():
     password = request.form.get("password")
 
     user = find_user_by_email(get_db(), email)
-    if not user or not get_bcrypt().check_password_hash(user["password"], password):
+    try:
+        valid, new_hash = get_hasher().check_and_upgrade(user["password"], password) if user else (False, None)
+    except PasswordHasherBusy:
+        flash("The server is busy. Please try again in a moment.", "warning")
+        return redirect(url_for("auth.login"))
+
+    if not valid:
         flash("Invalid credentials", "danger")
         return redirect(url_for("auth.login"))
 
-    # ✅ Save a unified user object in session
-    session["user"] = {
-        "id": str(user["_id"]),
-        "role": user["role"],
-        "name": user["first_name"],
-        "pic": user.get("profile_pic", "default.jpg")
-    }
+    # Stored hash used a different cost factor; upgrade it transparently
+    if new_hash:
+        get_db().users.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
 
-    # Optional: still keep the individual keys if older routes depend on them
-    session["user_id"] = str(user["_id"])
-    session["user_role"] = user["role"]
-    session["user_name"] = user["first_name"]
-    session["user_pic"] = user.get("profile_pic", "default.jpg")
+    # ✅ Cookie keeps only the user ID and version; the profile lives in the server-side cache
+    login_user(user)
 
     flash("Login successful!", "success")
 
@@ -110,6 +115,6 @@ def login():
 # ─────────────────────────────────────
 @auth_bp.route("/logout")
 def logout():
-    session.pop("user_id", None)
+    logout_user()
     flash("You've been logged out.", "info")
     return redirect(url_for("home"))
\ No newline at end of file
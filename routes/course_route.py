@@ -1,26 +1,39 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app, jsonify, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from functools import wraps
+import csv
+import io
+import json
 import os
 from bson import ObjectId
 from datetime import datetime
 from jinja2 import TemplateNotFound
+from pymongo.errors import DuplicateKeyError
 
-from models.enrollment_model import enroll_student, get_enrollments_by_course
+from models.enrollment_model import enroll_student, get_enrolled_students_page, iter_enrolled_students, get_student_courses
 from utils.decorators import login_required
-from models.course_model import create_course  # Optional use
+from models.course_model import create_course, get_course_page, get_enrollment_counts, insert_course  # Optional use
+from models.analytics_model import init_course_stats, get_instructor_stats
+from utils.identity import get_current_user, current_role
+from utils.images import save_upload, schedule_variants
+from utils.enrollment_membership import get_enrolled_course_ids, get_enrollment, is_enrolled, forget_enrollments
+from utils.cache import get_course_by_slug, get_course_by_id, invalidate_course, course_cache_stats
+from utils.response_cache import response_cache, cached_page
+from utils import search
+from utils.progress import parse_heartbeat
 course_routes = Blueprint('course_routes', __name__)
 
 # ✅ Restrict access to instructors
 def instructor_required(view_func):
     @wraps(view_func)
     def wrapper(*args, **kwargs):
-        if "user_id" not in session:
+        user = get_current_user()
+        if not user:
             flash("Login required", "warning")
             return redirect(url_for("auth.login"))
-        if session.get("user_role") != "instructor":
+        if user.get("role") != "instructor":
             flash("You’re not authorized", "danger")
-            return redirect(url_for("main_routes.home"))
+            return redirect(url_for("home"))
         return view_func(*args, **kwargs)
     return wrapper
 
@@ -32,20 +45,20 @@ def create_course_route():
     if request.method == "POST":
         title = request.form["title"]
         description = request.form["description"]
-        image = request.files["image"]
+        image = request.files.get("image")
 
-        # Handle image
+        # Handle image: stored under its content hash, resized variants come later
+        images_folder = os.path.join(current_app.root_path, "static", "images")
+        filename, image_data, image_variants = (None, None, [])
         if image and image.filename != "":
-            filename = secure_filename(image.filename)
-            image_path = os.path.join(current_app.root_path, "static", "images", filename)
-            image.save(image_path)
-        else:
+            filename, image_data, image_variants = save_upload(image, images_folder)
+        if not filename:
             filename = "default_course.jpg"
 
         # Get instructor details from session and database
         instructor_id = session.get("user_id")  # safer than session["user_id"]
 
-        user = current_app.db.users.find_one({"_id": ObjectId(instructor_id)})
+        user = get_current_user()
         if user:
             first_name = user.get("first_name", "").strip()
             last_name = user.get("last_name", "").strip()
@@ -53,27 +66,45 @@ def create_course_route():
         else:
             instructor_name = "Unknown"
 
-        # Slug for URL
-        slug = title.lower().replace(" ", "-")
-
-        # Final course document
+        # Final course document; insert_course() picks a free slug for the URL
         course = {
             "title": title,
             "description": description,
             "instructor_id": ObjectId(instructor_id),
             "instructor_name": instructor_name,  # ✅ now it's valid
             "image": filename,
-            "slug": slug,
-            "students": [],
+            "image_variants": image_variants,
+            "enrollment_count": 0,
+            "completed_count": 0,
             "created_at": datetime.now()
         }
 
         # Save to DB
-        current_app.db.courses.insert_one(course)
+        try:
+            insert_course(current_app.db, course)
+        except DuplicateKeyError:
+            flash("Couldn't find a free URL for that title. Please try a different one.", "danger")
+            return redirect(url_for("course_routes.create_course_route"))
+        slug = course["slug"]
+        invalidate_course(slug=slug)
+        init_course_stats(current_app.db, course)
+        search.add_course(course)
+        response_cache.invalidate()
+
+        if image_data and not image_variants:
+            app = current_app._get_current_object()
+
+            def variants_ready(widths):
+                with app.app_context():
+                    app.db.courses.update_one({"slug": slug}, {"$set": {"image_variants": widths}})
+                    invalidate_course(slug=slug)
+                    response_cache.invalidate()
+
+            schedule_variants(image_data, images_folder, filename, variants_ready)
         flash("Course created successfully!", "success")
         return redirect(url_for("instructor_dashboard"))
 
-    return render_template("create_course.html", instructor_name=session.get("user_name", "Instructor"))
+    return render_template("create_course.html", instructor_name=get_current_user().get("first_name", "Instructor"))
 
 
 
@@ -86,7 +117,7 @@ def enroll(slug):
     student_id = session.get("user_id")  # student ID stored in session
 
     # Find the course by slug
-    course = current_app.db.courses.find_one({"slug": slug})
+    course = get_course_by_slug(current_app.db, slug)
     if not course:
         flash("Course not found.", "danger")
         return redirect(url_for("course_routes.courses"))
@@ -95,6 +126,7 @@ def enroll(slug):
 
     # Check enrollment and enroll
     success = enroll_student(current_app.db, student_id, course_id)
+    forget_enrollments(student_id)
     if success:
         flash("Enrolled successfully!", "success")
     else:
@@ -105,51 +137,143 @@ def enroll(slug):
 
 @course_routes.route("/courses")
 @login_required
+@cached_page  # Login-only, so never served from the page cache: this only adds the ETag/304
 def courses():
     user_id = session.get("user_id")
-    role = session.get("user_role")
-
-    courses = list(current_app.db.courses.find())
+    role = current_role()
+
+    cursor = request.args.get("cursor")
+    direction = request.args.get("dir", "next")
+    page_size = request.args.get("per_page")
+    # Same page for every viewer until the catalog changes
+    page = response_cache.memoize(
+        ("catalog-page", cursor, direction, page_size),
+        lambda: get_course_page(current_app.catalog_db, cursor=cursor, direction=direction, page_size=page_size),
+    )
 
-    enrolled_course_ids = []
+    enrolled_course_ids = frozenset()
     if role == "student":
-        enrollments = list(current_app.db.enrollments.find({"student_id": ObjectId(user_id)}))
-        enrolled_course_ids = [enr["course_id"] for enr in enrollments]
+        enrolled_course_ids = get_enrolled_course_ids(current_app.db, user_id)
 
     return render_template(
         "courses.html",
-        courses=courses,
-        enrolled_course_ids=enrolled_course_ids
+        courses=page["courses"],
+        page=page,
+        enrolled_course_ids=enrolled_course_ids,
+        enrollment_counts=get_enrollment_counts(current_app.catalog_db, [course["_id"] for course in page["courses"]]),
     )
 
 
+# ✅ Course search (BM25 over titles, descriptions, instructors and lesson titles)
+SEARCH_RESULTS = 24
+
+
+@course_routes.route("/search")
+@login_required
+def search_courses():
+    query = request.args.get("q", "").strip()
+    results = search.get_search_index(current_app.catalog_db).search(query, limit=SEARCH_RESULTS) if query else []
+
+    enrolled_course_ids = frozenset()
+    if current_role() == "student":
+        enrolled_course_ids = get_enrolled_course_ids(current_app.db, session.get("user_id"))
+
+    return render_template(
+        "courses.html",
+        courses=results,
+        page=None,
+        query=query,
+        enrolled_course_ids=enrolled_course_ids,
+        enrollment_counts=get_enrollment_counts(current_app.catalog_db, [course.get("_id") for course in results]),
+    )
+
+
+@course_routes.route("/search/suggest")
+@login_required
+def search_suggest():
+    prefix = request.args.get("q", "")
+    return jsonify(search.get_search_index(current_app.catalog_db).suggest(prefix))
+
+
 
 
 # ✅ Instructors view students enrolled in a course
+ENROLLED_PER_PAGE = 50
+MY_COURSES_PER_PAGE = 20
+
+
+def teaches(course):
+    """Rosters hold names and emails, so only the course's own instructor may see them."""
+    return str(course.get("instructor_id")) == session.get("user_id")
+
+
 @course_routes.route("/enrolled-students/<course_id>")
 @instructor_required
 def enrolled_students(course_id):
     db = current_app.db
-    enrollments = get_enrollments_by_course(db, course_id)
+    course = get_course_by_id(db, course_id)
+    if not course:
+        return "Course not found", 404
+    if not teaches(course):
+        return "You’re not authorized", 403
 
-    student_ids = [ObjectId(e["student_id"]) for e in enrollments]
-    students = list(db.users.find({"_id": {"$in": student_ids}}))
+    page = max(request.args.get("page", 1, type=int), 1)
+    # One extra row tells us whether there is a next page; enrollment_count may lag
+    students = get_enrolled_students_page(db, course["_id"], page, ENROLLED_PER_PAGE, lookahead=1)
 
-    enrollment_map = {str(e["student_id"]): e["enrolled_at"] for e in enrollments}
+    return render_template(
+        "enrolled_students.html",
+        students=students[:ENROLLED_PER_PAGE],
+        course=course,
+        page=page,
+        offset=(page - 1) * ENROLLED_PER_PAGE,
+        has_next=len(students) > ENROLLED_PER_PAGE,
+    )
 
-    enriched_students = []
-    for student in students:
-        student_id_str = str(student["_id"])
-        full_name = f"{student.get('first_name', '')} {student.get('last_name', '')}".strip()
-        enriched_students.append({
-            "full_name": full_name,
-            "email": student.get("email", "N/A"),
-            "enrolled_at": enrollment_map.get(student_id_str)
-        })
 
-    course = db.courses.find_one({"_id": ObjectId(course_id)})
+@course_routes.route("/enrolled-students/<course_id>/export.<fmt>")
+@instructor_required
+def export_enrolled_students(course_id, fmt):
+    if fmt not in ("csv", "jsonl"):
+        return "Unsupported export format", 404
 
-    return render_template("enrolled_students.html", students=enriched_students, course=course)
+    db = current_app.db
+    course = get_course_by_id(db, course_id)
+    if not course:
+        return "Course not found", 404
+    if not teaches(course):
+        return "You’re not authorized", 403
+
+    rows = iter_enrolled_students(db, course["_id"])
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["full_name", "email", "enrolled_at", "completed"])
+        for row in rows:
+            enrolled_at = row.get("enrolled_at")
+            writer.writerow([
+                row["full_name"],
+                row["email"],
+                enrolled_at.isoformat() if enrolled_at else "",
+                bool(row.get("completed")),
+            ])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    def generate_jsonl():
+        for row in rows:
+            enrolled_at = row.get("enrolled_at")
+            yield json.dumps({**row, "enrolled_at": enrolled_at.isoformat() if enrolled_at else None}) + "\n"
+
+    generate = generate_csv if fmt == "csv" else generate_jsonl
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={course['slug']}-students.{fmt}"},
+    )
 
 
 
@@ -158,33 +282,37 @@ def enrolled_students(course_id):
 @instructor_required
 def instructor_dashboard():
     instructor_id = session.get("user_id")
-    courses = list(current_app.db.courses.find({"instructor_id": instructor_id}))
-    return render_template("instructor_dashboard.html", courses=courses)
+    stats = get_instructor_stats(current_app.db, instructor_id)
+    return render_template("instructor_dashboard.html", stats=stats)
+
+@course_routes.route("/instructor/cache-stats")
+@instructor_required
+def cache_stats():
+    return jsonify(
+        courses=course_cache_stats(),
+        password_hashing=current_app.password_hasher.metrics(),
+        progress=current_app.progress_buffer.metrics(),
+        mongo_pool=current_app.extensions["mongo"].metrics(),
+        responses=response_cache.stats(),
+    )
 
 @course_routes.route("/my-courses")
 @login_required
 def my_courses():
     student_id = session.get("user_id")
-    enrollments = list(current_app.db.enrollments.find({
-        "student_id": ObjectId(student_id)
-    }))
-
-    course_ids = [enrollment["course_id"] for enrollment in enrollments]
-    courses = list(current_app.db.courses.find({
-        "_id": {"$in": course_ids}
-    }))
+    page = max(request.args.get("page", 1, type=int), 1)
+    sort = request.args.get("sort", "activity")
 
-    # Map course_id to enrollment for easy lookup
-    enrollment_map = {str(e["course_id"]): e for e in enrollments}
+    courses = get_student_courses(current_app.db, student_id, page, MY_COURSES_PER_PAGE, sort, lookahead=1)
+    has_next = len(courses) > MY_COURSES_PER_PAGE
 
-    enrolled_courses = []
-    for course in courses:
-        course_id_str = str(course["_id"])
-        course["completed"] = enrollment_map[course_id_str].get("completed", False)
-        course["slug"] = course.get("slug", "")  # Ensure slug is passed to the template
-        enrolled_courses.append(course)
-
-    return render_template("my_courses.html", courses=enrolled_courses)
+    return render_template(
+        "my_courses.html",
+        courses=courses[:MY_COURSES_PER_PAGE],
+        page=page,
+        sort=sort,
+        has_next=has_next,
+    )
 
 
 
@@ -192,19 +320,17 @@ def my_courses():
 
 @course_routes.route("/course/<slug>")
 @login_required
+@cached_page  # Login-only: ETag/304 only, the page itself always renders
 def course_detail(slug):
-    course = current_app.db.courses.find_one({"slug": slug})
+    course = get_course_by_slug(current_app.db, slug)
     if not course:
         return "Course not found", 404
 
     # Check if the logged-in user is enrolled in this course
     user_id = session.get("user_id")
-    is_enrolled = current_app.db.enrollments.find_one({
-        "student_id": user_id,
-        "course_id": course["_id"]
-    })
+    enrolled = is_enrolled(current_app.db, user_id, course["_id"])
 
-    return render_template("course_detail.html", course=course, is_enrolled=bool(is_enrolled))
+    return render_template("course_detail.html", course=course, is_enrolled=enrolled)
 
 
 @course_routes.route("/study/<slug>")
@@ -213,15 +339,12 @@ def study(slug):
     user_id = session.get("user_id")
 
     # 1. Get the course by slug
-    course = current_app.db.courses.find_one({"slug": slug})
+    course = get_course_by_slug(current_app.db, slug)
     if not course:
         return "Course not found", 404
 
     # 2. Check if the user is enrolled
-    enrollment = current_app.db.enrollments.find_one({
-        "student_id": ObjectId(user_id),
-        "course_id": course["_id"]
-    })
+    enrollment = get_enrollment(current_app.db, user_id, course["_id"], {"progress": 1, "last_lesson": 1, "last_position": 1})
 
     if not enrollment:
         # Not enrolled
@@ -229,10 +352,21 @@ def study(slug):
 
     # 3. If enrolled, continue to render the course page
     progress = enrollment.get("progress", [])
-    return render_template("courses/{}.html".format(slug), course=course, progress=progress)
-
-
+    resume = {"lesson": enrollment.get("last_lesson", 0), "position": enrollment.get("last_position", 0)}
+    return render_template("courses/{}.html".format(slug), course=course, progress=progress, resume=resume)
 
 
+# ✅ Lesson progress heartbeats from the study page (buffered, flushed in bulk)
+@course_routes.route("/progress/<slug>", methods=["POST"])
+@login_required
+def record_progress(slug):
+    course = get_course_by_slug(current_app.db, slug)
+    if not course:
+        return jsonify(error="Course not found"), 404
 
+    heartbeat, error = parse_heartbeat(request.get_json(silent=True) or {})
+    if error:
+        return jsonify(error=error), 400
 
+    current_app.progress_buffer.record(session.get("user_id"), course["_id"], **heartbeat)
+    return jsonify(status="queued"), 202
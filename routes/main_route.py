@@ -0,0 +1,299 @@
+from flask import render_template, redirect, url_for, session, flash, request, current_app
+from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
+from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from models.enrollment_model import enroll_student, complete_enrollment
+from models.course_model import get_course_page
+from models.analytics_model import get_instructor_stats
+from utils.decorators import role_required, login_required
+from utils.passwords import password_hasher, PasswordHasherBusy
+from utils.mail_queue import mail_queue
+from utils.identity import get_current_user, update_current_user, profile_cache
+from utils.images import save_upload, schedule_variants
+from utils.cache import get_course_by_slug
+from utils.enrollment_membership import get_enrollment, is_enrolled
+from utils.course_utils import get_catalog_course
+from utils.response_cache import cached_page
+
+# Site-level pages (home, profile, dashboards, password reset, legacy course
+# views). They keep their unprefixed endpoint names, e.g. url_for("profile"),
+# so they are registered on the app itself rather than through a blueprint.
+_routes = []
+
+
+def route(rule, **options):
+    def decorator(view):
+        _routes.append((rule, view, options))
+        return view
+    return decorator
+
+
+def register_main_routes(app):
+    for rule, view, options in _routes:
+        app.add_url_rule(rule, view.__name__, view, **options)
+    app.context_processor(inject_user)
+
+
+def get_reset_serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'])
+
+
+def inject_user():
+    # Templates read identity from the server-side profile cache, not the cookie
+    return dict(current_user=get_current_user())
+
+
+
+# ───── Forgot Password ─────
+@route("/forgot-password", methods=["GET", "POST"])
+def forgot_password():
+    if request.method == "POST":
+        email = request.form.get("email")
+        user = current_app.db.users.find_one({"email": email})
+        if user:
+            token = get_reset_serializer().dumps(str(user["_id"]), salt="reset-password")
+            link = url_for("reset_password", token=token, _external=True)
+
+            # Sent by the background mail worker; the request doesn't wait on SMTP
+            mail_queue.enqueue(
+                "E-LEARN Password Reset Request",
+                [email],
+                f"Click the link below to reset your password: {link}. Ignore this email if you did not request a password reset.",
+            )
+
+            flash("Password reset link sent. Check your email.", "info")
+        else:
+            flash("Email not found.", "danger")
+    return render_template("forgot_password.html")
+
+@route("/reset-password/<token>", methods=["GET", "POST"])
+def reset_password(token):
+    try:
+        user_id = get_reset_serializer().loads(token, salt="reset-password", max_age=3600)  # 1 hour validity
+    except SignatureExpired:
+        flash("The reset link has expired.", "danger")
+        return redirect(url_for("forgot_password"))
+    except BadSignature:
+        flash("Invalid or broken reset link.", "danger")
+        return redirect(url_for("forgot_password"))
+
+    if request.method == "POST":
+        new_password = request.form.get("password")
+        confirm_password = request.form.get("confirm_password")
+        if new_password != confirm_password:
+            flash("Passwords do not match.", "warning")
+            return render_template('reset_password.html')
+        if len(new_password) < 6:
+            flash("Password must be at least 6 characters long.", "warning")
+            return render_template('reset_password.html')
+
+        try:
+            hashed = password_hasher.hash(new_password)
+        except PasswordHasherBusy:
+            flash("The server is busy. Please try again in a moment.", "warning")
+            return render_template('reset_password.html')
+        # New session version: every worker drops its cached profile for this user
+        current_app.db.users.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$set": {"password": hashed}, "$inc": {"session_version": 1}},
+        )
+        profile_cache.pop(str(user_id))
+        flash("Password reset successful. Please log in.", "success")
+        return redirect(url_for("auth.login"))
+
+    return render_template("reset_password.html")
+
+
+@route('/contact', methods=['GET', 'POST'])
+def contact():
+    if request.method == 'POST':
+        name = request.form.get('name')
+        email = request.form.get('email')
+        message = request.form.get('message')
+        # You can store in DB, or print for now:
+        print(f"Message from {name} ({email}): {message}")
+        flash("Thanks for reaching out! We'll get back to you shortly.", "success")
+        return redirect(url_for('contact'))
+    return render_template('contact.html')
+
+# ───── Student Dashboard ─────
+@route('/student/dashboard')
+@login_required
+@role_required("student")
+def student_dashboard():
+    return render_template("student_dashboard.html")
+
+# ───── Instructor Dashboard ─────
+@route('/instructor/dashboard')
+@login_required
+@role_required("instructor")
+def instructor_dashboard():
+    stats = get_instructor_stats(current_app.db, session.get("user_id"))
+    return render_template("instructor_dashboard.html", stats=stats)
+
+# ───── Profile Routes ─────
+@route('/profile')
+@login_required
+def profile():
+    user = get_current_user()
+    if not user:
+        return redirect(url_for("auth.login"))
+    return render_template("profile.html", user=user)
+
+@route('/upload-profile-picture', methods=['POST'])
+def upload_profile_picture():
+    if not get_current_user():
+        flash("You must be logged in to upload a profile picture.", "warning")
+        return redirect(url_for('auth.login'))
+
+    file = request.files.get('profile_pic')
+    if not file:
+        flash("No file selected.", "danger")
+        return redirect(url_for('profile'))
+
+    folder = current_app.config['UPLOAD_FOLDER']
+    filename, data, variants = save_upload(file, folder)
+    if not filename:
+        flash("Please upload a JPG, PNG, WebP or GIF image.", "danger")
+        return redirect(url_for('profile'))
+
+    user = update_current_user({'profile_pic': filename, 'profile_pic_variants': variants})
+
+    if data and not variants:
+        app = current_app._get_current_object()
+
+        def variants_ready(widths):
+            with app.app_context():
+                app.db.users.update_one(
+                    {'_id': user['_id'], 'profile_pic': filename},
+                    {'$set': {'profile_pic_variants': widths}, '$inc': {'session_version': 1}}
+                )
+                profile_cache.pop(str(user['_id']))
+
+        schedule_variants(data, folder, filename, variants_ready)
+    flash("Profile picture updated successfully!", "success")
+    return redirect(url_for('profile'))
+
+@route("/profile/edit", methods=["GET", "POST"])
+def edit_profile():
+    user = get_current_user()
+    if not user:
+        flash("Please log in first", "warning")
+        return redirect(url_for("auth.login"))
+
+    if request.method == "POST":
+        first_name = request.form.get("first_name", "").strip()
+        last_name = request.form.get("last_name", "").strip()
+        email = request.form.get("email", "").strip().lower()
+        new_password = request.form.get("password", "")
+        if not email:
+            flash("Email is required.", "warning")
+            return redirect(url_for("edit_profile"))
+
+        update_fields = {
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email
+        }
+
+        if new_password:
+            try:
+                update_fields["password"] = password_hasher.hash(new_password)
+            except PasswordHasherBusy:
+                flash("The server is busy. Please try again in a moment.", "warning")
+                return redirect(url_for("edit_profile"))
+
+        try:
+            update_current_user(update_fields)
+        except DuplicateKeyError:
+            flash("That email is already in use by another account.", "danger")
+            return redirect(url_for("edit_profile"))
+        flash("Profile updated successfully", "success")
+        return redirect(url_for("profile"))
+
+    return render_template("edit_profile.html", user=user)
+
+# ───── Other Routes ─────
+@route('/')
+@cached_page
+def home():
+    return render_template("home.html")
+
+@route('/about')
+@cached_page
+def about():
+    return render_template("about.html")
+
+
+
+@route("/courses")
+@login_required
+def courses():
+    page = get_course_page(
+        current_app.catalog_db,
+        cursor=request.args.get("cursor"),
+        direction=request.args.get("dir", "next"),
+        page_size=request.args.get("per_page"),
+    )
+
+    return render_template("courses.html", courses=page["courses"], page=page)
+
+
+@route("/course/<slug>")
+@login_required
+def course_detail(slug):
+    course = get_catalog_course(slug)
+    if not course:
+        return "Course not found", 404
+    return render_template("course_detail.html", course=course)
+
+@route("/enroll/<slug>")
+@login_required
+def enroll(slug):
+    user_id = session.get('user_id')
+    if not user_id:
+        return redirect(url_for('login'))
+
+    # Lookup course by slug
+    course = get_course_by_slug(current_app.db, slug)
+    if not course:
+        return "Course not found", 404
+
+    course_id = course["_id"]
+
+    # Enroll using your model
+    enroll_student(current_app.db, user_id, course_id)
+
+    return redirect(url_for('study_course', slug=slug))
+     
+
+@route("/study/<slug>")
+@login_required
+def study_course(slug):
+    user_id = session.get('user_id')
+    course = get_course_by_slug(current_app.db, slug)
+    if not course:
+        return "Course not found", 404
+
+    enrollment = get_enrollment(current_app.db, user_id, course["_id"])
+    if not enrollment:
+        return redirect(url_for('courses'))
+
+    return render_template("study.html", course=course, enrollment=enrollment)  
+
+@route("/complete/<slug>", methods=["POST"])
+@login_required
+def complete_course(slug):
+    user_id = session.get('user_id')
+    course = get_course_by_slug(current_app.db, slug)
+    if not course:
+        return redirect(url_for('courses'))
+
+    if not is_enrolled(current_app.db, user_id, course["_id"]):
+        return redirect(url_for('courses'))
+
+    complete_enrollment(current_app.db, user_id, course["_id"])
+
+    flash("Congratulations! You have completed the course.", "success")
+    return redirect(url_for('study_course', slug=slug))
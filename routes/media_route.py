@@ -0,0 +1,126 @@
+import mimetypes
+import os
+from datetime import datetime, timezone
+
+from flask import Blueprint, Response, abort, current_app, request
+from werkzeug.security import safe_join
+from werkzeug.wsgi import wrap_file
+
+from utils.cache import TTLCache
+
+media_bp = Blueprint("media", __name__)
+
+MEDIA_CACHE_CONTROL = "public, max-age=86400"
+
+# (size, mtime, etag, mimetype) per file; a short TTL bounds how long a
+# replaced video can be served with stale metadata
+media_metadata = TTLCache(maxsize=1024, ttl=30)
+
+
+def get_media_folder():
+    return current_app.config.get("MEDIA_FOLDER") or os.path.join(current_app.root_path, "static", "videos")
+
+
+def get_metadata(path):
+    meta = media_metadata.get(path)
+    if meta is None:
+        stat = os.stat(path)
+        meta = {
+            "size": stat.st_size,
+            "mtime": datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc),
+            "etag": f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+            "mimetype": mimetypes.guess_type(path)[0] or "application/octet-stream",
+        }
+        media_metadata.set(path, meta)
+    return meta
+
+
+class BoundedFile:
+    """A file positioned at `start` that reads at most `length` bytes.
+
+    fileno() is passed through, so servers whose wsgi.file_wrapper uses
+    sendfile() (gunicorn does, bounded by Content-Length) stream the range
+    straight from the page cache without copying it through Python.
+    """
+
+    def __init__(self, file, start, length):
+        self._file = file
+        self._remaining = length
+        file.seek(start)
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def _range_applies(meta):
+    """False when If-Range names a different version, in which case the full file is sent."""
+    if_range = request.if_range
+    if not (if_range.etag or if_range.date):
+        return True
+    if if_range.etag:
+        return if_range.etag == meta["etag"]
+    # A date only validates if it is exactly the Last-Modified we sent (RFC 9110 13.1.5)
+    return if_range.date == meta["mtime"]
+
+
+@media_bp.route("/media/<path:filename>")
+def stream(filename):
+    path = safe_join(get_media_folder(), filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    meta = get_metadata(path)
+    size = meta["size"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": MEDIA_CACHE_CONTROL,
+    }
+
+    response = Response(status=200, mimetype=meta["mimetype"], headers=headers)
+    response.set_etag(meta["etag"])
+    response.last_modified = meta["mtime"]
+    if request.if_none_match.contains(meta["etag"]):
+        response.status_code = 304
+        return response
+
+    start, length = 0, size
+    byte_range = request.range if _range_applies(meta) else None
+    if byte_range is not None and len(byte_range.ranges) > 1:
+        # Players only ask for one range; rather than build multipart/byteranges, send it all
+        byte_range = None
+    if byte_range is not None:
+        bounds = byte_range.range_for_length(size)
+        if bounds is None:
+            # Starts past the end of the file
+            response.status_code = 416
+            response.headers["Content-Range"] = f"bytes */{size}"
+            return response
+        start, stop = bounds
+        length = stop - start
+        response.status_code = 206
+        response.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+
+    if current_app.config.get("MEDIA_X_ACCEL_PREFIX"):
+        # Hand the transfer (ranges included) to nginx, which uses sendfile itself
+        response.headers["X-Accel-Redirect"] = current_app.config["MEDIA_X_ACCEL_PREFIX"].rstrip("/") + "/" + filename
+        response.status_code = 200
+        response.headers.pop("Content-Range", None)
+        return response
+
+    body = BoundedFile(open(path, "rb"), start, length)
+    response.response = wrap_file(request.environ, body)
+    response.direct_passthrough = True
+    response.content_length = length
+    return response
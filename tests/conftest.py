@@ -0,0 +1,104 @@
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def make_config():
+    """Settings for create_app() that never reach a real server or mail host."""
+    def make(database, **overrides):
+        config = types.SimpleNamespace(
+            SECRET_KEY="test",
+            # MongoClient connects lazily, so an unreachable URI is fine until a query runs
+            MONGODB_URI="mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=200",
+            MONGODB_DATABASE=database,
+            BCRYPT_LOG_ROUNDS=4,
+            MAIL_SERVER="localhost",
+            MAIL_PORT=25,
+            MAIL_USE_TLS=False,
+            MAIL_USERNAME=None,
+            MAIL_PASSWORD=None,
+            MAIL_DEFAULT_SENDER="test@example.com",
+            # No outbox polling against the unreachable server
+            MAIL_QUEUE_AUTOSTART=False,
+        )
+        for key, value in overrides.items():
+            setattr(config, key, value)
+        return config
+    return make
+
+
+@pytest.fixture
+def db():
+    """An in-memory database for model-level tests."""
+    mongomock = pytest.importorskip("mongomock")
+    return mongomock.MongoClient()["elearn_test"]
+
+
+@pytest.fixture
+def replay_bulk_writes():
+    """Let a mongomock collection take bulk_write() of UpdateOne requests.
+
+    mongomock rejects the `sort` option current PyMongo passes for each
+    UpdateOne, so the requests are applied one update_one() at a time.
+    """
+    def patch(collection):
+        def bulk_write(requests, ordered=True):
+            matched = modified = upserted = 0
+            for request in requests:
+                result = collection.update_one(request._filter, request._doc, upsert=request._upsert)
+                matched += result.matched_count
+                modified += result.modified_count
+                upserted += result.upserted_id is not None
+            return types.SimpleNamespace(matched_count=matched, modified_count=modified, upserted_count=upserted)
+        collection.bulk_write = bulk_write
+        return collection
+    return patch
+
+
+@pytest.fixture
+def mongo_app(make_config, tmp_path):
+    """An app whose MongoDB is an in-memory mongomock client; use app.db to seed it."""
+    mongomock = pytest.importorskip("mongomock")
+    from factory import create_app
+    from utils.identity import profile_cache
+
+    client = mongomock.MongoClient()
+    app = create_app(make_config(
+        "elearn_test",
+        MONGO_CLIENT_FACTORY=lambda uri, **options: client,
+        RESPONSE_CACHE_DIR=str(tmp_path / "response_cache"),
+    ))
+    app.config["TESTING"] = True
+    profile_cache.clear()
+    yield app
+    profile_cache.clear()
+
+
+@pytest.fixture
+def add_user(mongo_app):
+    """Insert a user with password "secret" and return its _id."""
+    import bcrypt
+
+    def add(email, role="student", **fields):
+        pw_hash = bcrypt.hashpw(b"secret", bcrypt.gensalt(4)).decode()
+        user = dict(email=email, role=role, first_name=role.title(), last_name="User",
+                    password=pw_hash, session_version=0, **fields)
+        with mongo_app.app_context():
+            return mongo_app.db.users.insert_one(user).inserted_id
+    return add
+
+
+@pytest.fixture
+def login(mongo_app):
+    def log_in(email, password="secret"):
+        client = mongo_app.test_client()
+        response = client.post("/auth/login", data={"email": email, "password": password})
+        assert response.status_code == 302
+        return client
+    return log_in
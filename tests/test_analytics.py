@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from models.analytics_model import (
+    DAILY_RETENTION_DAYS, _day, backfill_course_stats_fields, get_instructor_stats, record_course_event,
+)
+
+
+def test_first_event_for_a_legacy_course_copies_its_instructor_fields(db):
+    instructor_id = ObjectId()
+    course_id = db.courses.insert_one({"title": "Python", "slug": "python", "instructor_id": instructor_id}).inserted_id
+
+    record_course_event(db, course_id, enrolled=1)
+    record_course_event(db, course_id, completed=1)
+
+    stats = get_instructor_stats(db, instructor_id)
+    assert [(row["title"], row["enrollments"], row["completions"]) for row in stats] == [("Python", 1, 1)]
+    assert stats[0]["recent"][-1] == (_day(), 1)
+
+
+def test_backfill_fills_rollups_missing_instructor_fields(db):
+    instructor_id = ObjectId()
+    course_id = db.courses.insert_one({"title": "Go", "slug": "go", "instructor_id": instructor_id}).inserted_id
+    db.course_stats.insert_one({"_id": course_id, "enrollments": 3})
+
+    assert backfill_course_stats_fields(db) == 1
+    assert db.course_stats.find_one({"_id": course_id})["instructor_id"] == instructor_id
+    assert backfill_course_stats_fields(db) == 0
+
+
+def test_first_event_of_a_day_drops_days_outside_the_window(db):
+    course_id = ObjectId()
+    expired = _day(datetime.now() - timedelta(days=DAILY_RETENTION_DAYS + 1))
+    kept = _day(datetime.now() - timedelta(days=1))
+    db.course_stats.insert_one({
+        "_id": course_id,
+        "daily_pruned_on": kept,
+        "daily": {expired: {"enrollments": 4}, kept: {"enrollments": 2}},
+    })
+
+    record_course_event(db, course_id, enrolled=1)
+
+    daily = db.course_stats.find_one({"_id": course_id})["daily"]
+    assert sorted(daily) == [kept, _day()]
@@ -0,0 +1,43 @@
+import io
+
+import pytest
+
+from models.enrollment_model import bulk_enroll_students, iter_student_emails
+
+
+def test_csv_uses_the_email_column_and_normalizes():
+    source = io.StringIO("name,Email\nAda,  ADA@example.com \nBob,not-an-email\n\nCy,cy@example.com\n")
+    assert list(iter_student_emails(source, "csv")) == ["ada@example.com", "cy@example.com"]
+
+
+def test_csv_without_header_reads_the_first_column():
+    source = io.StringIO("ada@example.com,Ada\nbob@example.com\n")
+    assert list(iter_student_emails(source, "csv")) == ["ada@example.com", "bob@example.com"]
+
+
+def test_jsonl_accepts_objects_and_bare_strings():
+    source = io.StringIO('{"email": "Ada@example.com"}\n\n"bob@example.com"\n{"name": "no email"}\n')
+    assert list(iter_student_emails(source, "jsonl")) == ["ada@example.com", "bob@example.com"]
+
+
+def test_bulk_enroll_counts_inserted_duplicates_and_unknown(db, replay_bulk_writes):
+    replay_bulk_writes(db.enrollments)
+    course_id = db.courses.insert_one({"slug": "python", "title": "Python", "enrollment_count": 0}).inserted_id
+    db.users.insert_many([{"email": f"s{i}@example.com", "role": "student"} for i in range(5)])
+    emails = ["s0@example.com", "s1@example.com", "s0@example.com", "ghost@example.com", "s2@example.com"]
+
+    stats = bulk_enroll_students(db, "python", iter(emails), chunk_size=2)
+
+    assert (stats["rows"], stats["inserted"], stats["duplicates"], stats["unknown"]) == (5, 3, 1, 1)
+    assert db.enrollments.count_documents({"course_id": course_id}) == 3
+    assert db.courses.find_one({"_id": course_id})["enrollment_count"] == 3
+
+    # Re-running is idempotent: everyone is already enrolled
+    again = bulk_enroll_students(db, "python", iter(emails), chunk_size=2)
+    assert again["inserted"] == 0
+    assert db.enrollments.count_documents({"course_id": course_id}) == 3
+
+
+def test_bulk_enroll_unknown_course(db):
+    with pytest.raises(ValueError, match="not found"):
+        bulk_enroll_students(db, "missing", iter(["a@example.com"]))
@@ -0,0 +1,61 @@
+import pytest
+
+from utils import cache
+from utils.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    entries = TTLCache(maxsize=4, ttl=10)
+    entries.set("a", 1)
+    clock[0] += 9
+    assert entries.get("a") == 1
+    clock[0] += 2
+    assert entries.get("a", "gone") == "gone"
+    assert entries.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    entries = TTLCache(maxsize=2, ttl=10)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.get("a")  # "b" is now the oldest
+    entries.set("c", 3)
+
+    assert entries.get("b") is None
+    assert entries.get("a") == 1 and entries.get("c") == 3
+    assert entries.stats()["evictions"] == 1
+
+
+def test_stats_and_pop(clock):
+    entries = TTLCache()
+    entries.set("a", 1)
+    entries.get("a")
+    entries.get("missing")
+    assert entries.pop("a") == 1
+    assert entries.pop("a", "default") == "default"
+
+    stats = entries.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_course_lookups_share_entries_until_invalidated(db):
+    cache.course_cache.clear()
+    course_id = db.courses.insert_one({"slug": "python", "title": "Python", "students": ["legacy"]}).inserted_id
+
+    course = cache.get_course_by_slug(db, "python")
+    assert "students" not in course
+    db.courses.update_one({"_id": course_id}, {"$set": {"title": "Python 3"}})
+    # Served from the entry the slug lookup stored under the id too
+    assert cache.get_course_by_id(db, str(course_id))["title"] == "Python"
+
+    cache.invalidate_course(course_id=course_id)
+    assert cache.get_course_by_slug(db, "python")["title"] == "Python 3"
+    assert cache.get_course_by_id(db, "not-an-id") is None
+    cache.course_cache.clear()
@@ -0,0 +1,18 @@
+from models.course_model import insert_course, slugify
+
+
+def test_slugify_strips_url_characters():
+    assert slugify("C++ / Intro?") == "c-intro"
+    assert slugify("  Café & Crème  ") == "cafe-creme"
+    assert slugify("???") == "course"
+
+
+def test_insert_course_suffixes_taken_slugs(db):
+    db.courses.create_index("slug", unique=True)
+    slugs = []
+    for _ in range(3):
+        course = {"title": "Python for Beginners"}
+        insert_course(db, course)
+        slugs.append(course["slug"])
+
+    assert slugs == ["python-for-beginners", "python-for-beginners-2", "python-for-beginners-3"]
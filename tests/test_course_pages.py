@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from models.course_model import decode_cursor, encode_cursor, get_course_page
+from models.indexes import backfill_course_created_at
+
+
+def _seed(db, count=7):
+    start = datetime(2024, 1, 1)
+    # Pairs of courses share a timestamp so the _id tie-break matters
+    db.courses.insert_many([
+        {"title": f"Course {i}", "slug": f"course-{i}", "created_at": start + timedelta(minutes=i // 2)}
+        for i in range(count)
+    ])
+    return [doc["_id"] for doc in db.courses.find().sort([("created_at", -1), ("_id", -1)])]
+
+
+def _walk(db, page_size, direction="next", cursor=None):
+    seen = []
+    while True:
+        page = get_course_page(db, cursor, direction, page_size)
+        ids = [course["_id"] for course in page["courses"]]
+        seen = seen + ids if direction == "next" else ids + seen
+        cursor = page["next_cursor"] if direction == "next" else page["prev_cursor"]
+        if cursor is None:
+            return seen, page
+
+
+def test_cursor_round_trip():
+    course = {"_id": ObjectId(), "created_at": datetime(2024, 5, 6, 7, 8, 9, 123000)}
+    assert decode_cursor(encode_cursor(course)) == (course["created_at"], course["_id"])
+    assert decode_cursor("not-a-cursor") is None
+
+
+def test_forward_pages_cover_the_catalog_once_newest_first(db):
+    expected = _seed(db)
+    seen, last = _walk(db, page_size=3)
+    assert seen == expected
+    assert last["prev_cursor"] is not None
+
+
+def test_prev_cursor_returns_the_previous_page(db):
+    expected = _seed(db)
+    first = get_course_page(db, page_size=3)
+    second = get_course_page(db, first["next_cursor"], "next", 3)
+    back = get_course_page(db, second["prev_cursor"], "prev", 3)
+
+    assert [c["_id"] for c in back["courses"]] == expected[:3]
+    assert back["prev_cursor"] is None
+    assert back["next_cursor"] is not None
+
+
+def test_courses_without_created_at_page_after_backfill(db):
+    expected = _seed(db, count=4)
+    legacy = db.courses.insert_one({"title": "Legacy", "slug": "legacy"}).inserted_id
+
+    assert backfill_course_created_at(db) == 1
+    seen, _ = _walk(db, page_size=2)
+    assert sorted(seen) == sorted(expected + [legacy])
+    assert len(seen) == len(set(seen))
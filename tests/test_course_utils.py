@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+
+from utils.course_utils import CourseCatalogFile, iter_json_array
+
+
+def _write(path, courses):
+    path.write_text(json.dumps(courses), encoding="utf-8")
+
+
+def test_iter_json_array_handles_elements_across_chunks(tmp_path):
+    path = tmp_path / "courses.json"
+    courses = [{"slug": f"course-{i}", "lessons": ["x" * 50] * i} for i in range(20)]
+    _write(path, courses)
+    # A tiny chunk size forces every element to straddle reads
+    assert list(iter_json_array(str(path), chunk_size=7)) == courses
+
+
+@pytest.mark.parametrize("text", ['{"slug": "a"}', '[{"slug": "a"}'])
+def test_iter_json_array_rejects_malformed_files(tmp_path, text):
+    path = tmp_path / "courses.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path)))
+
+
+def test_catalog_reloads_only_when_the_file_changes(tmp_path):
+    path = tmp_path / "courses.json"
+    _write(path, [{"slug": "python", "title": "Python"}])
+    catalog = CourseCatalogFile(str(path), check_interval=0)
+
+    assert catalog.get("python")["title"] == "Python"
+    first = catalog.all()
+    assert catalog.all() is first  # unchanged file: no re-parse
+
+    _write(path, [{"slug": "python", "title": "Python 3"}, {"slug": "go", "title": "Go"}])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert catalog.get("python")["title"] == "Python 3"
+    assert [course["slug"] for course in catalog.all()] == ["python", "go"]
+
+
+def test_catalog_keeps_the_last_good_copy(tmp_path):
+    path = tmp_path / "courses.json"
+    _write(path, [{"slug": "python"}])
+    catalog = CourseCatalogFile(str(path), check_interval=0)
+    assert catalog.get("python")
+
+    path.write_text("[{broken", encoding="utf-8")
+    catalog.refresh(force=True)
+    assert catalog.get("python") == {"slug": "python"}
+
+
+def test_stat_is_skipped_within_the_check_interval(tmp_path):
+    path = tmp_path / "courses.json"
+    _write(path, [{"slug": "python"}])
+    catalog = CourseCatalogFile(str(path), check_interval=3600)
+    assert catalog.get("python")
+
+    _write(path, [{"slug": "go"}])
+    assert catalog.get("go") is None
+    catalog.refresh(force=True)
+    assert catalog.get("go") == {"slug": "go"}
@@ -0,0 +1,54 @@
+import pytest
+
+from factory import create_app
+from utils.db import mongo
+from utils.passwords import password_hasher
+
+EXTENSIONS = ("mongo", "instrumentation", "password_hasher", "mail_queue", "assets", "progress_buffer", "response_cache")
+
+
+@pytest.fixture
+def two_apps(make_config):
+    a = create_app(make_config("db_a"))
+    b = create_app(make_config("db_b", BCRYPT_LOG_ROUNDS=5))
+    yield a, b
+    for app in (a, b):
+        app.extensions["mongo"].close()
+
+
+def test_apps_get_their_own_extensions(two_apps):
+    a, b = two_apps
+    for name in EXTENSIONS:
+        assert a.extensions[name] is not b.extensions[name], name
+
+
+def test_apps_keep_their_own_database(two_apps):
+    a, b = two_apps
+    assert a.db.name == "db_a"
+    assert b.db.name == "db_b"
+
+
+def test_creating_an_app_does_not_touch_another(two_apps):
+    a, b = two_apps
+    # Only this app's query monitor, not one per create_app() call
+    assert len(a.extensions["mongo"].event_listeners) == 1
+    assert len(b.extensions["mongo"].event_listeners) == 1
+    assert a.password_hasher.rounds == 4
+    assert b.password_hasher.rounds == 5
+
+
+def test_module_proxies_follow_the_current_app(two_apps):
+    a, b = two_apps
+    with a.app_context():
+        assert mongo.get_db().name == "db_a"
+        assert password_hasher.rounds == 4
+    with b.app_context():
+        assert mongo.get_db().name == "db_b"
+        assert password_hasher.rounds == 5
+
+
+def test_mail_worker_starts_on_first_request_only_when_enabled(make_config):
+    on = create_app(make_config("db_a", MAIL_QUEUE_AUTOSTART=True))
+    off = create_app(make_config("db_b"))
+    assert on.extensions["mail_queue"].ensure_worker in on.before_request_funcs[None]
+    assert off.extensions["mail_queue"].ensure_worker not in off.before_request_funcs.get(None, [])
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from models.indexes import INDEX_MIGRATIONS, IndexMigrationError, ensure_indexes, get_index_version
+
+
+def test_duplicate_enrollments_are_merged_before_the_unique_index(db):
+    course_id = db.courses.insert_one({"slug": "python", "enrollment_count": 3, "completed_count": 0}).inserted_id
+    student_id = ObjectId()
+    db.enrollments.insert_many([
+        {"student_id": student_id, "course_id": course_id, "enrolled_at": datetime(2024, 1, 2),
+         "progress": [1, 2], "last_activity_at": datetime(2024, 1, 5), "last_lesson": 2},
+        {"student_id": student_id, "course_id": course_id, "enrolled_at": datetime(2024, 1, 1),
+         "progress": [2, 3], "completed": True, "completed_at": datetime(2024, 1, 3),
+         "last_activity_at": datetime(2024, 1, 4), "last_lesson": 3},
+        {"student_id": ObjectId(), "course_id": course_id, "enrolled_at": datetime(2024, 1, 1)},
+    ])
+
+    assert ensure_indexes(db) == [version for version, _, _ in INDEX_MIGRATIONS]
+
+    merged = db.enrollments.find_one({"student_id": student_id})
+    assert db.enrollments.count_documents({"student_id": student_id}) == 1
+    assert merged["enrolled_at"] == datetime(2024, 1, 1)
+    assert merged["completed"] is True and merged["status"] == "completed"
+    assert sorted(merged["progress"]) == [1, 2, 3]
+    assert merged["last_lesson"] == 2
+    assert db.courses.find_one({"_id": course_id})["enrollment_count"] == 2
+
+
+def test_duplicate_emails_fail_with_the_offending_keys(db):
+    db.users.insert_many([{"email": "a@example.com"}, {"email": "a@example.com"}])
+
+    with pytest.raises(IndexMigrationError, match=r"users\.email_unique.*'a@example.com' \(2 documents\)"):
+        ensure_indexes(db)
+    assert get_index_version(db) == 0
@@ -0,0 +1,74 @@
+import pytest
+from werkzeug.http import http_date
+
+from factory import create_app
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media(make_config, tmp_path):
+    (tmp_path / "intro.mp4").write_bytes(CONTENT)
+    app = create_app(make_config("elearn_test", MEDIA_FOLDER=str(tmp_path)))
+    client = app.test_client()
+    full = client.get("/media/intro.mp4")
+    return client, full.headers["ETag"], full.headers["Last-Modified"]
+
+
+def test_full_file(media):
+    client, _, _ = media
+    response = client.get("/media/intro.mp4")
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers["Accept-Ranges"] == "bytes"
+
+
+def test_single_range(media):
+    client, _, _ = media
+    response = client.get("/media/intro.mp4", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == f"bytes 10-19/{len(CONTENT)}"
+    assert response.data == CONTENT[10:20]
+
+    suffix = client.get("/media/intro.mp4", headers={"Range": "bytes=-5"})
+    assert suffix.status_code == 206 and suffix.data == CONTENT[-5:]
+
+
+def test_unsatisfiable_range(media):
+    client, _, _ = media
+    response = client.get("/media/intro.mp4", headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_multiple_ranges_get_the_whole_file(media):
+    client, _, _ = media
+    response = client.get("/media/intro.mp4", headers={"Range": "bytes=0-1,5-6"})
+    assert response.status_code == 200
+    assert response.data == CONTENT
+
+
+def test_if_range_etag(media):
+    client, etag, _ = media
+    same = client.get("/media/intro.mp4", headers={"Range": "bytes=0-9", "If-Range": etag})
+    other = client.get("/media/intro.mp4", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert same.status_code == 206 and same.data == CONTENT[:10]
+    assert other.status_code == 200 and other.data == CONTENT
+
+
+def test_if_range_date_must_match_exactly(media):
+    client, _, last_modified = media
+    exact = client.get("/media/intro.mp4", headers={"Range": "bytes=0-9", "If-Range": last_modified})
+    later = client.get("/media/intro.mp4", headers={"Range": "bytes=0-9", "If-Range": http_date(4102444800)})
+    assert exact.status_code == 206
+    assert later.status_code == 200 and later.data == CONTENT
+
+
+def test_if_none_match(media):
+    client, etag, _ = media
+    assert client.get("/media/intro.mp4", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_path_outside_the_media_folder(media):
+    client, _, _ = media
+    assert client.get("/media/../secret.txt").status_code == 404
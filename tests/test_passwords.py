@@ -0,0 +1,43 @@
+import pytest
+
+from utils.passwords import PasswordHasher, PasswordHasherBusy, hash_rounds
+
+
+def _hasher(rounds=4, **settings):
+    hasher = PasswordHasher()
+    hasher.rounds = rounds
+    for name, value in settings.items():
+        setattr(hasher, name, value)
+    return hasher
+
+
+def test_hash_and_check():
+    hasher = _hasher()
+    pw_hash = hasher.hash("s3cret")
+    assert hash_rounds(pw_hash) == 4
+    assert hasher.check(pw_hash, "s3cret")
+    assert not hasher.check(pw_hash, "wrong")
+    assert not hasher.check("not-a-hash", "s3cret")
+
+
+def test_check_and_upgrade_rehashes_at_the_configured_cost():
+    old_hash = _hasher(rounds=4).hash("s3cret")
+    hasher = _hasher(rounds=5)
+
+    valid, new_hash = hasher.check_and_upgrade(old_hash, "s3cret")
+    assert valid and hash_rounds(new_hash) == 5
+    assert hasher.check_and_upgrade(new_hash, "s3cret") == (True, None)
+    assert hasher.check_and_upgrade(old_hash, "wrong") == (False, None)
+
+
+def test_full_queue_raises_busy():
+    hasher = _hasher(max_pending=1, queue_timeout=0)
+    hasher.hash("warm")  # creates the semaphores
+    hasher._slots.acquire()
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("s3cret")
+    finally:
+        hasher._slots.release()
+    assert hasher.metrics()["rejected"] == 1
+    assert hasher.metrics()["queue_depth"] == 0
@@ -0,0 +1,44 @@
+from pymongo import ASCENDING
+
+
+def test_edit_profile_rejects_an_email_already_in_use(mongo_app, add_user, login):
+    mongo_app.db.users.create_index([("email", ASCENDING)], unique=True)
+    user_id = add_user("ada@example.com")
+    add_user("bob@example.com")
+    client = login("ada@example.com")
+
+    response = client.post("/profile/edit", data={"first_name": "Ada", "last_name": "L", "email": "bob@example.com"},
+                           follow_redirects=True)
+
+    assert response.status_code == 200
+    assert b"already in use" in response.data
+    assert mongo_app.db.users.find_one({"_id": user_id})["email"] == "ada@example.com"
+
+
+def test_edit_profile_rejects_an_empty_email(mongo_app, add_user, login):
+    user_id = add_user("ada@example.com")
+    client = login("ada@example.com")
+
+    response = client.post("/profile/edit", data={"first_name": "Ada", "last_name": "L", "email": "  "},
+                           follow_redirects=True)
+
+    assert b"Email is required" in response.data
+    assert mongo_app.db.users.find_one({"_id": user_id})["email"] == "ada@example.com"
+
+
+def test_password_reset_bumps_the_session_version(mongo_app, add_user, login):
+    from routes.main_route import get_reset_serializer
+    from utils.identity import profile_cache
+
+    user_id = add_user("ada@example.com")
+    login("ada@example.com")
+    assert profile_cache.get(str(user_id)) is not None
+    with mongo_app.test_request_context():
+        token = get_reset_serializer().dumps(str(user_id), salt="reset-password")
+
+    response = mongo_app.test_client().post(f"/reset-password/{token}",
+                                            data={"password": "new-secret", "confirm_password": "new-secret"})
+
+    assert response.status_code == 302
+    assert mongo_app.db.users.find_one({"_id": user_id})["session_version"] == 1
+    assert profile_cache.get(str(user_id)) is None
@@ -0,0 +1,68 @@
+import pytest
+from bson import ObjectId
+
+from utils.progress import ProgressBuffer, parse_heartbeat
+
+
+@pytest.mark.parametrize("data, fields", [
+    ({"lesson": 2, "position": 31.5}, {"lesson": 2, "position": 31.5, "completed": False}),
+    ({"lesson": 0, "completed": True}, {"lesson": 0, "position": None, "completed": True}),
+    ({}, {"lesson": None, "position": None, "completed": False}),
+])
+def test_parse_heartbeat_accepts(data, fields):
+    assert parse_heartbeat(data) == (fields, None)
+
+
+@pytest.mark.parametrize("data", [
+    [1, 2], "lesson", {"lesson": True}, {"lesson": -1}, {"lesson": "2"}, {"lesson": 1.5},
+    {"position": -3}, {"position": False}, {"position": "10"},
+])
+def test_parse_heartbeat_rejects(data):
+    fields, error = parse_heartbeat(data)
+    assert fields is None and error
+
+
+@pytest.fixture
+def buffer(mongo_app, replay_bulk_writes):
+    replay_bulk_writes(mongo_app.db.enrollments)
+    buffer = mongo_app.extensions["progress_buffer"]
+    buffer.ensure_worker = lambda: None  # flush explicitly, not on a timer
+    return buffer
+
+
+def test_flush_coalesces_heartbeats_into_one_update(mongo_app, buffer):
+    student_id, course_id = ObjectId(), ObjectId()
+    mongo_app.db.enrollments.insert_one({"student_id": student_id, "course_id": course_id, "progress": [1]})
+
+    buffer.record(student_id, course_id, lesson=1, position=10)
+    buffer.record(student_id, course_id, lesson=2, completed=True)
+    buffer.record(student_id, course_id, lesson=3, position=42)
+
+    assert buffer.flush() == 1
+    enrollment = mongo_app.db.enrollments.find_one({"student_id": student_id})
+    assert (enrollment["last_lesson"], enrollment["last_position"]) == (3, 42)
+    assert sorted(enrollment["progress"]) == [1, 2]
+    assert buffer.metrics()["pending"] == 0
+    assert buffer.flush() == 0
+
+
+def test_heartbeats_without_an_enrollment_write_nothing(mongo_app, buffer):
+    buffer.record(ObjectId(), ObjectId(), lesson=1)
+    assert buffer.flush() == 1
+    assert mongo_app.db.enrollments.count_documents({}) == 0
+
+
+def test_failed_flush_requeues_and_merges_completed_lessons(mongo_app, buffer):
+    student_id, course_id = ObjectId(), ObjectId()
+    buffer.record(student_id, course_id, lesson=1, completed=True)
+
+    def fail(requests, ordered=True):
+        buffer.record(student_id, course_id, lesson=2, completed=True)  # arrives mid-flush
+        raise RuntimeError("primary stepped down")
+
+    mongo_app.db.enrollments.bulk_write = fail
+    assert buffer.flush() == 0
+
+    pending = buffer._pending.pop((student_id, course_id))  # not retried by the atexit flush
+    assert pending["lesson"] == 2
+    assert pending["completed"] == {1, 2}
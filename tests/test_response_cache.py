@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from utils.response_cache import CatalogVersion, FileSystemBackend, MemoryBackend
+
+
+def test_memory_backends_share_invalidation(tmp_path):
+    # Two workers on one host: separate LRUs, one VERSION file
+    first = MemoryBackend(CatalogVersion(str(tmp_path)))
+    second = MemoryBackend(CatalogVersion(str(tmp_path)))
+    key = ("page", second.version(), "/")
+    second.set(key, "old page")
+
+    first.bump()
+
+    assert second.version() == first.version() == 1
+    assert second.get(key) is None
+
+
+def test_filesystem_backend_round_trip_and_bump(tmp_path):
+    backend = FileSystemBackend(CatalogVersion(str(tmp_path)), str(tmp_path))
+    key = ("fragment", backend.version(), "course-card")
+    backend.set(key, "<div>card</div>")
+    assert backend.get(key) == "<div>card</div>"
+
+    backend.bump()
+
+    assert backend.version() == 1
+    assert backend.get(key) is None
+    assert backend.stats()["size"] == 0
+
+
+def test_course_cards_show_live_enrollment_counts(mongo_app, add_user, login):
+    instructor_id = add_user("teacher@example.com", role="instructor")
+    add_user("student@example.com")
+    mongo_app.db.courses.insert_one({
+        "title": "Python", "slug": "python", "description": "Learn", "image": "python.jpg",
+        "instructor_id": instructor_id, "enrollment_count": 0, "created_at": datetime.now(),
+    })
+    teacher = login("teacher@example.com")
+    assert b"Students:</strong> 0" in teacher.get("/courses").data
+
+    login("student@example.com").post("/enroll/python")
+
+    page = teacher.get("/courses").data
+    assert b"Students:</strong> 1" in page
+    assert b"View Enrolled Students" in page
@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from utils import search
+from utils.search import SearchIndex
+
+
+def _index(*courses):
+    index = SearchIndex()
+    for slug, title, description in courses:
+        index.add(slug, {"title": title, "description": description}, {"slug": slug})
+    return index
+
+
+def _slugs(results):
+    return [doc["slug"] for doc in results]
+
+
+def test_title_matches_outrank_description_matches():
+    index = _index(
+        ("intro", "Cooking Basics", "A gentle start, with a short python detour"),
+        ("python", "Python for Beginners", "Learn to program"),
+    )
+    assert _slugs(index.search("python")) == ["python", "intro"]
+
+
+def test_last_word_matches_as_a_prefix():
+    index = _index(("python", "Python for Beginners", ""), ("pandas", "Data analysis with Pandas", ""))
+    assert _slugs(index.search("pyth")) == ["python"]
+    assert set(_slugs(index.search("p"))) == {"python", "pandas"}
+    assert index.search("the and") == []
+
+
+def test_readding_a_document_replaces_it():
+    index = _index(("python", "Python for Beginners", ""))
+    index.add("python", {"title": "Rust for Beginners"}, {"slug": "python"})
+    assert index.search("python") == []
+    assert _slugs(index.search("rust")) == ["python"]
+
+    index.remove("python")
+    assert len(index) == 0
+    assert index.suggest("ru") == []
+
+
+def test_suggest_prefers_common_terms():
+    index = _index(
+        ("a", "Python Basics", ""),
+        ("b", "Python Advanced", ""),
+        ("c", "Pygame Projects", ""),
+    )
+    assert index.suggest("learn py") == ["python", "pygame"]
+    assert index.suggest("") == []
+
+
+class RecordedThread:
+    """Stands in for threading.Thread: records background rebuilds instead of running them."""
+    started = None
+
+    def __init__(self, target, args, **kwargs):
+        self.args = args
+
+    def start(self):
+        self.started.append(self.args)
+
+
+@pytest.fixture
+def course_index(monkeypatch):
+    """Fresh module-level index state, restored after the test. Returns the rebuilds started."""
+    monkeypatch.setattr(search, "_index", SearchIndex())
+    monkeypatch.setattr(search, "_rebuilding", None)
+    monkeypatch.setattr(search, "_retry_at", 0.0)
+    monkeypatch.setattr(RecordedThread, "started", [])
+    monkeypatch.setattr(search, "Thread", RecordedThread)
+    return RecordedThread.started
+
+
+def test_index_is_built_from_mongodb_only(db, course_index):
+    db.courses.insert_one({"title": "Python for Beginners", "slug": "python-for-beginners", "description": "Learn"})
+    index = search.get_search_index(db)
+    assert len(index) == 1
+    assert _slugs(index.search("python")) == ["python-for-beginners"]
+
+
+def test_failed_rebuild_backs_off(db, course_index, monkeypatch):
+    stale = SearchIndex()
+    stale.built_at = time.monotonic() - search.REBUILD_INTERVAL - 1
+    search._index = stale
+
+    assert search.get_search_index(db) is stale
+    assert len(course_index) == 1  # one background rebuild started
+
+    def fail(db):
+        raise RuntimeError("no primary")
+    monkeypatch.setattr(search, "build_course_index", fail)
+    search._rebuild(db)
+
+    # Still stale, but no new rebuild until the retry delay has passed
+    assert search.get_search_index(db) is stale
+    assert len(course_index) == 1
+    search._retry_at = time.monotonic() - 1
+    search.get_search_index(db)
+    assert len(course_index) == 2
@@ -0,0 +1,173 @@
+import json
+import re
+from http import HTTPStatus
+from urllib.parse import parse_qsl
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from itsdangerous import BadSignature
+from werkzeug.http import parse_cookie
+
+from utils.identity import PROFILE_PROJECTION, profile_cache
+
+# ─────────────────────────────────────
+# MINIMAL ASGI PLUMBING
+# Just enough routing/request/response handling for the async JSON API.
+# Everything the router doesn't match is passed to the Flask app through
+# asgiref's WSGI adapter, so one ASGI server can serve the whole site.
+# ─────────────────────────────────────
+MAX_BODY = 64 * 1024
+
+
+class AsgiRequest:
+    def __init__(self, scope, body=b""):
+        self.scope = scope
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        self.headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        self.cookies = parse_cookie(self.headers.get("cookie", ""))
+        self.body = body
+
+    def get_json(self):
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError:
+            return None
+
+
+class JSONResponse:
+    def __init__(self, payload, status=200):
+        self.body = json.dumps(payload).encode()
+        self.status = status
+
+    async def send(self, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(self.body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": self.body})
+
+
+def error(status, message=None):
+    return JSONResponse({"error": message or HTTPStatus(status).phrase}, status)
+
+
+class AsyncRouter:
+    """Flask-style `<name>` rules mapped to `async def handler(request, user, **kwargs)`."""
+
+    def __init__(self):
+        self.rules = []
+
+    def route(self, rule, methods=("GET",), login=True):
+        pattern = re.compile("^" + re.sub(r"<(\w+)>", r"(?P<\1>[^/]+)", rule) + "$")
+
+        def decorator(handler):
+            self.rules.append((pattern, frozenset(methods), login, handler))
+            return handler
+        return decorator
+
+    def match(self, method, path):
+        for pattern, methods, login, handler in self.rules:
+            found = pattern.match(path)
+            if found and method in methods:
+                return handler, login, found.groupdict()
+        return None, False, None
+
+
+async def load_user(flask_app, db, request):
+    """Resolve the logged-in user from Flask's signed session cookie.
+
+    Mirrors utils.identity.get_current_user(): the profile cache answers when
+    the cookie's session version matches, otherwise the profile is re-read
+    and accepted as long as the user still exists. The cookie itself isn't
+    rewritten here; the next Flask page updates its version.
+    """
+    cookie = request.cookies.get(flask_app.config["SESSION_COOKIE_NAME"])
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    if not cookie or serializer is None:
+        return None
+    try:
+        session = serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+        user_id = session["user_id"]
+        object_id = ObjectId(user_id)
+    except (BadSignature, KeyError, TypeError, InvalidId):
+        return None
+
+    profile = profile_cache.get(user_id)
+    if profile is None or profile.get("session_version", 0) != session.get("uv", 0):
+        profile = await db.users.find_one({"_id": object_id}, PROFILE_PROJECTION)
+        if profile is None:
+            return None
+        profile_cache.set(user_id, profile)
+    return profile
+
+
+async def read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY:
+            return None
+        if not message.get("more_body"):
+            return body
+
+
+class AsgiApp:
+    """Routes matching `router` are served natively; everything else goes to the Flask app."""
+
+    def __init__(self, flask_app, router, on_startup=(), on_shutdown=()):
+        self.flask_app = flask_app
+        self.router = router
+        self.on_startup = list(on_startup)
+        self.on_shutdown = list(on_shutdown)
+        self._wsgi = None
+
+    @property
+    def wsgi(self):
+        if self._wsgi is None:
+            from asgiref.wsgi import WsgiToAsgi
+            self._wsgi = WsgiToAsgi(self.flask_app)
+        return self._wsgi
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                for hook in self.on_startup:
+                    await hook()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for hook in self.on_shutdown:
+                    await hook()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+
+        handler, login, kwargs = (None, False, None)
+        if scope["type"] == "http":
+            handler, login, kwargs = self.router.match(scope["method"], scope["path"])
+        if handler is None:
+            return await self.wsgi(scope, receive, send)
+
+        body = await read_body(receive) if scope["method"] in ("POST", "PUT", "PATCH") else b""
+        if body is None:
+            return await error(413).send(send)
+
+        request = AsgiRequest(scope, body)
+        # Handlers reach this app's extensions (utils.db.mongo, ...) through current_app
+        with self.flask_app.app_context():
+            db = self.flask_app.extensions["mongo"].get_async_db()
+            user = await load_user(self.flask_app, db, request)
+            if login and user is None:
+                return await error(401, "Login required").send(send)
+
+            response = await handler(request, user, **kwargs)
+        if not isinstance(response, JSONResponse):
+            response = JSONResponse(response)
+        await response.send(send)
@@ -0,0 +1,135 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import current_app, request, send_from_directory
+from werkzeug.local import LocalProxy
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip variants are always built
+    brotli = None
+
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+# User uploads change at runtime and lecture videos are too big to copy
+SKIP_DIRS = {DIST_DIR, "uploads", "videos"}
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt", ".html", ".map", ".ico"}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ENCODING_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _fingerprint(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(64 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def build_assets(static_folder):
+    """Copy every static file to dist/ under a content-hashed name and precompress text assets.
+
+    Writes dist/manifest.json mapping the original path (as passed to
+    url_for('static', filename=...)) to its fingerprinted path and the
+    precompressed encodings available for it. Returns the manifest.
+    """
+    dist_folder = os.path.join(static_folder, DIST_DIR)
+    if os.path.isdir(dist_folder):
+        shutil.rmtree(dist_folder)
+    os.makedirs(dist_folder)
+
+    files = {}
+    for root, dirs, names in os.walk(static_folder):
+        rel_root = os.path.relpath(root, static_folder)
+        if rel_root == ".":
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in sorted(names):
+            source = os.path.join(root, name)
+            logical = os.path.normpath(os.path.join(rel_root, name)).replace(os.sep, "/")
+            base, ext = os.path.splitext(logical)
+            hashed = f"{DIST_DIR}/{base}.{_fingerprint(source)}{ext}"
+            target = os.path.join(static_folder, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+
+            encodings = []
+            if ext.lower() in COMPRESSIBLE:
+                with open(source, "rb") as file:
+                    data = file.read()
+                with open(target + ".gz", "wb") as out:
+                    out.write(gzip.compress(data, compresslevel=9, mtime=0))
+                encodings.append("gzip")
+                if brotli is not None:
+                    with open(target + ".br", "wb") as out:
+                        out.write(brotli.compress(data, quality=11))
+                    encodings.append("br")
+            files[logical] = {"path": hashed, "encodings": encodings}
+
+    manifest = {"files": files}
+    with open(os.path.join(dist_folder, MANIFEST_NAME), "w") as out:
+        json.dump(manifest, out, indent=2, sort_keys=True)
+    return manifest
+
+
+class Assets:
+    """Rewrites url_for('static') to fingerprinted files and serves them with far-future caching.
+
+    Without a built manifest (`flask build-assets`) everything falls back to
+    Flask's normal static handling.
+    """
+
+    def __init__(self, app=None):
+        self.paths = {}
+        self.encodings = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.load(app.static_folder)
+        app.url_defaults(self._rewrite_static_url)
+        fallback = app.view_functions["static"]
+
+        def static(filename):
+            if filename in self.encodings:
+                return self._send_fingerprinted(app.static_folder, filename)
+            return fallback(filename=filename)
+
+        app.view_functions["static"] = static
+        app.assets = self
+        app.extensions["assets"] = self
+
+    def load(self, static_folder):
+        path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+        try:
+            with open(path) as file:
+                files = json.load(file)["files"]
+        except (OSError, ValueError, KeyError):
+            files = {}
+        self.paths = {logical: entry["path"] for logical, entry in files.items()}
+        self.encodings = {entry["path"]: entry["encodings"] for entry in files.values()}
+
+    def _rewrite_static_url(self, endpoint, values):
+        if endpoint == "static" and values.get("filename") in self.paths:
+            values["filename"] = self.paths[values["filename"]]
+
+    def _send_fingerprinted(self, static_folder, filename):
+        accepted = request.accept_encodings
+        encoding, suffix = next(
+            ((enc, suffix) for enc, suffix in ENCODING_SUFFIXES
+             if enc in self.encodings[filename] and accepted[enc]),
+            (None, ""),
+        )
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        response = send_from_directory(static_folder, filename + suffix, mimetype=mimetype, max_age=31536000)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+assets = LocalProxy(lambda: current_app.extensions["assets"])
@@ -0,0 +1,121 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class TTLCache:
+    """A small thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# ─────────────────────────────────────
+# COURSE CACHE
+# Entries are stored under both ("slug", slug) and ("id", _id).
+# ─────────────────────────────────────
+course_cache = TTLCache(maxsize=512, ttl=300)
+
+
+def _remember_course(course):
+    course_cache.set(("slug", course["slug"]), course)
+    course_cache.set(("id", course["_id"]), course)
+
+
+def get_course_by_slug(db, slug):
+    course = course_cache.get(("slug", slug))
+    if course is None:
+        course = db.courses.find_one({"slug": slug}, {"students": 0})
+        if course:
+            _remember_course(course)
+    return course
+
+
+async def get_course_by_slug_async(db, slug):
+    """get_course_by_slug() for the async API: same cache, async driver on a miss."""
+    course = course_cache.get(("slug", slug))
+    if course is None:
+        course = await db.courses.find_one({"slug": slug}, {"students": 0})
+        if course:
+            _remember_course(course)
+    return course
+
+
+def get_course_by_id(db, course_id):
+    try:
+        course_id = ObjectId(course_id)
+    except (InvalidId, TypeError):
+        return None
+    course = course_cache.get(("id", course_id))
+    if course is None:
+        course = db.courses.find_one({"_id": course_id}, {"students": 0})
+        if course:
+            _remember_course(course)
+    return course
+
+
+def invalidate_course(slug=None, course_id=None):
+    """Drop a course from the cache; either key is enough to find the other."""
+    cached = []
+    if slug is not None:
+        cached.append(course_cache.pop(("slug", slug)))
+    if course_id is not None:
+        cached.append(course_cache.pop(("id", ObjectId(course_id))))
+    for course in filter(None, cached):
+        course_cache.pop(("slug", course.get("slug")))
+        course_cache.pop(("id", course["_id"]))
+
+
+def course_cache_stats():
+    return course_cache.stats()
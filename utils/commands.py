@@ -0,0 +1,150 @@
+import os
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from models.analytics_model import rebuild_course_stats
+from models.enrollment_model import BULK_CHUNK_SIZE, backfill_course_counters, bulk_enroll_students, iter_student_emails
+from models.indexes import IndexMigrationError, ensure_indexes, explain_hot_queries, get_index_version
+from utils.assets import build_assets
+from utils.cache import course_cache
+from utils.images import generate_folder_variants
+from utils.response_cache import response_cache
+
+
+# ─────────────────────────────────────
+# flask init-indexes
+# ─────────────────────────────────────
+@click.command("init-indexes")
+@with_appcontext
+@click.option("--explain/--no-explain", default=True, help="Print the query plan of each hot query afterwards.")
+def init_indexes_command(explain):
+    """Create or upgrade MongoDB indexes."""
+    db = current_app.db
+    try:
+        applied = ensure_indexes(db)
+    except IndexMigrationError as exc:
+        raise click.ClickException(str(exc))
+    if applied:
+        click.echo(f"Applied index migrations: {', '.join(map(str, applied))}")
+    else:
+        click.echo(f"Indexes already at version {get_index_version(db)}")
+
+    if explain:
+        for row in explain_hot_queries(db):
+            flag = "COLLSCAN" if row["collscan"] else "ok"
+            click.echo(f"[{flag:>8}] {row['query']}: {' <- '.join(row['stages'])}")
+
+
+# ─────────────────────────────────────
+# flask bulk-enroll
+# ─────────────────────────────────────
+@click.command("bulk-enroll")
+@with_appcontext
+@click.argument("course_slug")
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None,
+              help="Input format; guessed from the file extension when omitted.")
+@click.option("--chunk-size", default=BULK_CHUNK_SIZE, show_default=True, help="Emails resolved and written per batch.")
+def bulk_enroll_command(course_slug, source, fmt, chunk_size):
+    """Enroll every student email in SOURCE (CSV or JSONL, '-' for stdin) into COURSE_SLUG."""
+    if fmt is None:
+        fmt = "jsonl" if source.name.endswith((".jsonl", ".ndjson")) else "csv"
+
+    try:
+        stats = bulk_enroll_students(current_app.db, course_slug, iter_student_emails(source, fmt), chunk_size)
+    except ValueError as exc:
+        raise click.ClickException(str(exc))
+
+    click.echo(
+        f"{stats['rows']} rows: {stats['inserted']} enrolled, {stats['duplicates']} duplicates, "
+        f"{stats['unknown']} unknown emails in {stats['seconds']:.2f}s ({stats['rows_per_second']:.0f} rows/s)"
+    )
+
+
+# ─────────────────────────────────────
+# flask backfill-counters
+# ─────────────────────────────────────
+@click.command("backfill-counters")
+@with_appcontext
+def backfill_counters_command():
+    """Recount enrollment/completed counters per course and drop the students array."""
+    updated = backfill_course_counters(current_app.db)
+    click.echo(f"Backfilled counters on {updated} courses")
+
+
+# ─────────────────────────────────────
+# flask send-mail
+# ─────────────────────────────────────
+@click.command("send-mail")
+@with_appcontext
+def send_mail_command():
+    """Deliver every queued email that is due, then exit."""
+    sent, failed = current_app.mail_queue.drain()
+    click.echo(f"Sent {sent} emails, {failed} failed (will retry with backoff)")
+
+
+# ─────────────────────────────────────
+# flask image-variants
+# ─────────────────────────────────────
+@click.command("image-variants")
+@with_appcontext
+def image_variants_command():
+    """Generate resized WebP/JPEG variants for existing course images."""
+    folder = os.path.join(current_app.root_path, "static", "images")
+    for name, widths in generate_folder_variants(folder):
+        result = current_app.db.courses.update_many({"image": name}, {"$set": {"image_variants": widths}})
+        click.echo(f"{name}: {', '.join(map(str, widths))}px ({result.modified_count} courses updated)")
+    course_cache.clear()
+    response_cache.invalidate()
+
+
+# ─────────────────────────────────────
+# flask build-assets
+# ─────────────────────────────────────
+@click.command("build-assets")
+@with_appcontext
+def build_assets_command():
+    """Fingerprint and precompress static files into static/dist."""
+    manifest = build_assets(current_app.static_folder)
+    compressed = sum(1 for entry in manifest["files"].values() if entry["encodings"])
+    click.echo(f"Built {len(manifest['files'])} assets ({compressed} precompressed) into static/dist")
+
+
+# ─────────────────────────────────────
+# flask rebuild-analytics
+# ─────────────────────────────────────
+@click.command("rebuild-analytics")
+@with_appcontext
+@click.option("--active-days", default=7, show_default=True, help="Window for counting active learners.")
+def rebuild_analytics_command(active_days):
+    """Recompute instructor dashboard rollups from enrollments (schedule this, e.g. nightly)."""
+    written = rebuild_course_stats(current_app.db, active_days)
+    click.echo(f"Rebuilt stats for {written} courses")
+
+
+# ─────────────────────────────────────
+# flask warm-up
+# ─────────────────────────────────────
+@click.command("warm-up")
+@with_appcontext
+@click.option("--indexes/--no-indexes", default=None, help="Apply index migrations (default: ENSURE_INDEXES_ON_STARTUP).")
+@click.option("--search/--no-search", default=False, help="Also build the course search index.")
+def warm_up_command(indexes, search):
+    """Compile templates and load the catalog, reporting how long each step takes."""
+    from factory import warm_up
+
+    for step, seconds in warm_up(current_app._get_current_object(), indexes, search).items():
+        click.echo(f"{step}: {seconds * 1000:.1f} ms")
+
+
+def register_commands(app):
+    app.cli.add_command(init_indexes_command)
+    app.cli.add_command(bulk_enroll_command)
+    app.cli.add_command(backfill_counters_command)
+    app.cli.add_command(send_mail_command)
+    app.cli.add_command(image_variants_command)
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(rebuild_analytics_command)
+    app.cli.add_command(warm_up_command)
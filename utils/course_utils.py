@@ -0,0 +1,122 @@
+import json
+import os
+import time
+from threading import Lock
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "courses.json")
+CHUNK_SIZE = 64 * 1024
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE):
+    """Yield the elements of a top-level JSON array without reading the whole file.
+
+    Only one element (plus one read chunk) is held in memory at a time, so big
+    catalogs with long lesson lists parse in flat memory.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        buffer = ""
+        position = 0
+        started = False
+        eof = False
+
+        while True:
+            # Skip whitespace and separators between elements
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+
+            if position >= len(buffer):
+                if eof:
+                    raise ValueError(f"{path}: unexpected end of JSON array")
+                buffer = file.read(chunk_size)
+                position = 0
+                eof = not buffer
+                continue
+
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError(f"{path}: expected a JSON array")
+                started = True
+                position += 1
+                continue
+
+            if buffer[position] == "]":
+                return
+
+            try:
+                item, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The element straddles a chunk boundary; read more and retry
+                more = file.read(chunk_size)
+                eof = not more
+                buffer = buffer[position:] + more
+                position = 0
+                continue
+
+            yield item
+            position = end
+
+
+class CourseCatalogFile:
+    """Memoized slug -> course index over a JSON catalog file.
+
+    The file is parsed once and re-parsed only when its mtime or size changes.
+    The stat() check itself runs at most every `check_interval` seconds, so
+    almost every lookup is a plain dict read with no file I/O.
+    """
+
+    def __init__(self, path=CATALOG_PATH, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._signature = None
+        self._courses = []
+        self._by_slug = {}
+        self._next_check = 0.0
+        self._lock = Lock()
+
+    def _load(self, signature):
+        courses = []
+        by_slug = {}
+        for course in iter_json_array(self.path):
+            courses.append(course)
+            if course.get("slug"):
+                by_slug[course["slug"]] = course
+        self._courses, self._by_slug, self._signature = courses, by_slug, signature
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        with self._lock:
+            if not force and now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+            try:
+                stat = os.stat(self.path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+                if force or signature != self._signature:
+                    self._load(signature)
+            except (OSError, ValueError) as e:
+                # Keep serving the last good catalog
+                print("Error loading courses:", e)
+
+    def get(self, slug):
+        self.refresh()
+        return self._by_slug.get(slug)
+
+    def all(self):
+        self.refresh()
+        return self._courses
+
+
+catalog_file = CourseCatalogFile()
+
+
+def get_catalog_course(slug):
+    return catalog_file.get(slug)
+
+
+def load_catalog_courses():
+    return catalog_file.all()
@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from collections import deque
+
+from flask import current_app
+from pymongo import AsyncMongoClient, MongoClient, ReadPreference, monitoring
+from werkzeug.local import LocalProxy
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Collects connection-pool checkout latency and in-use counts from PyMongo's pool events."""
+
+    def __init__(self, window=1024):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.open_connections = 0
+        self.pool_clears = 0
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self._latencies.append(event.duration)
+
+    def connection_check_out_failed(self, event):
+        # Usually waitQueueTimeoutMS expiring because every connection is busy
+        with self._lock:
+            self.checkout_failures += 1
+            self._latencies.append(event.duration)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def metrics(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            metrics = {
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "open_connections": self.open_connections,
+                "pool_clears": self.pool_clears,
+            }
+        if latencies:
+            metrics["checkout_ms"] = {
+                "p50": latencies[len(latencies) // 2] * 1000,
+                "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+                "max": latencies[-1] * 1000,
+            }
+        return metrics
+
+
+class Database:
+    """Owns the MongoClient and creates it lazily, once per process.
+
+    MongoClient starts background threads and sockets that must not be
+    shared across fork(), so nothing connects at import time. The first use
+    in a process (e.g. each gunicorn worker after it forks) builds a new
+    client. `app.db` and `app.catalog_db` are proxies that always resolve to
+    the current process's client, so code holding them stays valid.
+
+    Config:
+        MONGODB_URI, MONGODB_DATABASE
+        MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_WAIT_QUEUE_TIMEOUT_MS
+        MONGO_COMPRESSORS        e.g. "zstd,snappy" (needs the zstandard / python-snappy packages)
+        MONGO_CATALOG_SECONDARY  read catalog queries from secondaries when available
+        MONGO_CLIENT_FACTORY     callable(uri, **options) used instead of MongoClient,
+                                 e.g. to run the benchmarks against mongomock
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.pool_monitor = PoolMonitor()
+        self.event_listeners = []
+        self._client = None
+        self._pid = None
+        self._async_client = None
+        self._async_pid = None
+        self._lock = threading.Lock()
+        self.created_at = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["mongo"] = self
+        app.db = LocalProxy(self.get_db)
+        app.catalog_db = LocalProxy(self.get_catalog_db)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._forget_client)
+
+    def _client_options(self):
+        config = self.app.config
+        options = {
+            "maxPoolSize": config.get("MONGO_MAX_POOL_SIZE", 50),
+            "minPoolSize": config.get("MONGO_MIN_POOL_SIZE", 0),
+            "waitQueueTimeoutMS": config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000),
+            "serverSelectionTimeoutMS": config.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+            "appname": config.get("MONGO_APPNAME", "elearn"),
+            "event_listeners": [self.pool_monitor, *self.event_listeners],
+        }
+        if config.get("MONGO_COMPRESSORS"):
+            options["compressors"] = config["MONGO_COMPRESSORS"]
+        return options
+
+    def add_listener(self, listener):
+        """Register a PyMongo event listener; it applies to clients created from now on."""
+        self.event_listeners.append(listener)
+
+    def _forget_client(self):
+        # The parent's client is unusable in the child; drop it without closing
+        # so the parent's sockets aren't touched
+        self._client = None
+        self._pid = None
+        self._async_client = None
+        self._async_pid = None
+        self.pool_monitor = PoolMonitor()
+
+    @property
+    def client(self):
+        if self._client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    factory = self.app.config.get("MONGO_CLIENT_FACTORY") or MongoClient
+                    self._client = factory(self.app.config["MONGODB_URI"], **self._client_options())
+                    self._pid = os.getpid()
+                    self.created_at = time.time()
+        return self._client
+
+    @property
+    def async_client(self):
+        """PyMongo's native asyncio client, for the ASGI entry point (asgi.py).
+
+        Created on first use inside the process's event loop, with the same
+        pool options and listeners as the synchronous client.
+        """
+        if self._async_client is None or self._async_pid != os.getpid():
+            with self._lock:
+                if self._async_client is None or self._async_pid != os.getpid():
+                    self._async_client = AsyncMongoClient(self.app.config["MONGODB_URI"], **self._client_options())
+                    self._async_pid = os.getpid()
+        return self._async_client
+
+    def get_async_db(self):
+        return self.async_client[self.app.config.get("MONGODB_DATABASE", "elearn_demo")]
+
+    def get_async_catalog_db(self):
+        db = self.get_async_db()
+        if self.app.config.get("MONGO_CATALOG_SECONDARY"):
+            return db.with_options(read_preference=ReadPreference.SECONDARY_PREFERRED)
+        return db
+
+    async def close_async(self):
+        if self._async_client is not None and self._async_pid == os.getpid():
+            await self._async_client.close()
+        self._async_client = None
+        self._async_pid = None
+
+    def get_db(self):
+        return self.client[self.app.config.get("MONGODB_DATABASE", "elearn_demo")]
+
+    def get_catalog_db(self):
+        """The database for read-mostly catalog queries (course listings, search).
+
+        Reads go to a secondary when MONGO_CATALOG_SECONDARY is set, which can
+        return slightly stale data, so read-your-writes paths use `get_db()`.
+        """
+        db = self.get_db()
+        if self.app.config.get("MONGO_CATALOG_SECONDARY"):
+            return db.with_options(read_preference=ReadPreference.SECONDARY_PREFERRED)
+        return db
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+    def metrics(self):
+        metrics = self.pool_monitor.metrics()
+        metrics["pid"] = os.getpid()
+        metrics["max_pool_size"] = self.app.config.get("MONGO_MAX_POOL_SIZE", 50) if self.app else None
+        return metrics
+
+
+mongo = LocalProxy(lambda: current_app.extensions["mongo"])
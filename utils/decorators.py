@@ -1,14 +1,17 @@
 from functools import wraps
-from flask import session, redirect, url_for, flash
+from flask import session, redirect, url_for, flash, jsonify
+
+from utils.identity import get_current_user
 
 def role_required(role):
     def decorator(view_func):
         @wraps(view_func)
         def wrapper(*args, **kwargs):
-            if "user_id" not in session:
+            user = get_current_user()
+            if not user:
                 flash("You must be logged in.", "warning")
                 return redirect(url_for("auth.login"))
-            if session.get("user_role") != role:
+            if user.get("role") != role:
                 flash("You are not authorized to access this page.", "danger")
                 return redirect(url_for("home"))
             return view_func(*args, **kwargs)
@@ -20,10 +23,18 @@ def role_required(role):
 def login_required(view_function):
     @wraps(view_function)
     def wrapper(*args, **kwargs):
-        if 'user' not in session:
+        if not get_current_user():
             flash("You must be logged in to access this page.", "warning")
             return redirect(url_for('auth.login'))
         return view_function(*args, **kwargs)
     return wrapper
 
  
+def api_login_required(view_function):
+    """Like login_required, but answers JSON clients with a 401 instead of a redirect."""
+    @wraps(view_function)
+    def wrapper(*args, **kwargs):
+        if not get_current_user():
+            return jsonify(error="Login required"), 401
+        return view_function(*args, **kwargs)
+    return wrapper
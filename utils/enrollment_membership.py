@@ -0,0 +1,77 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import g, has_app_context
+
+
+# ─────────────────────────────────────
+# REQUEST-SCOPED CACHE
+# Lives on flask.g, so it is dropped at the end of every request.
+# ─────────────────────────────────────
+def _request_cache():
+    if not has_app_context():
+        return {}
+    if "enrollment_membership" not in g:
+        g.enrollment_membership = {}
+    return g.enrollment_membership
+
+
+def _as_object_id(value):
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def get_enrolled_course_ids(db, student_id):
+    """Return a frozenset of the course IDs a student is enrolled in.
+
+    The query filters and projects on (student_id, course_id) only, so the
+    unique enrollment index covers it. The set is computed once per request.
+    """
+    student_id = _as_object_id(student_id)
+    if student_id is None:
+        return frozenset()
+
+    cache = _request_cache()
+    key = ("course_ids", student_id)
+    if key not in cache:
+        cursor = db.enrollments.find({"student_id": student_id}, {"_id": 0, "course_id": 1})
+        cache[key] = frozenset(enrollment["course_id"] for enrollment in cursor)
+    return cache[key]
+
+
+def is_enrolled(db, student_id, course_id):
+    course_id = _as_object_id(course_id)
+    return course_id is not None and course_id in get_enrolled_course_ids(db, student_id)
+
+
+def get_enrollment(db, student_id, course_id, projection=None):
+    """Fetch one enrollment document, memoized for the rest of the request.
+
+    A miss is remembered too, and short-circuits when the membership set is
+    already loaded and doesn't contain the course. The projection is part of
+    the key, so a narrow lookup never answers one that needs more fields.
+    """
+    student_id = _as_object_id(student_id)
+    course_id = _as_object_id(course_id)
+    if student_id is None or course_id is None:
+        return None
+
+    cache = _request_cache()
+    fields = tuple(sorted(projection.items())) if isinstance(projection, dict) else tuple(sorted(projection or ()))
+    key = ("enrollment", student_id, course_id, fields)
+    if key not in cache:
+        known = cache.get(("course_ids", student_id))
+        if known is not None and course_id not in known:
+            cache[key] = None
+        else:
+            cache[key] = db.enrollments.find_one({"student_id": student_id, "course_id": course_id}, projection)
+    return cache[key]
+
+
+def forget_enrollments(student_id):
+    """Drop this request's cached membership after the student enrolls."""
+    student_id = _as_object_id(student_id)
+    cache = _request_cache()
+    for key in [key for key in cache if key[1] == student_id]:
+        del cache[key]
@@ -0,0 +1,30 @@
+from flask_cors import CORS
+from flask_mail import Mail
+
+from utils.assets import Assets
+from utils.db import Database
+from utils.instrumentation import Instrumentation
+from utils.mail_queue import MailQueue
+from utils.passwords import PasswordHasher
+from utils.progress import ProgressBuffer
+from utils.response_cache import ResponseCache
+
+# Every app built by create_app() gets its own extension objects, stored in
+# app.extensions. The module-level names (utils.db.mongo, utils.passwords.
+# password_hasher, ...) are proxies to the current app's instance, so two
+# apps in one process never share a client, pool or worker thread. None of
+# them do I/O here: the Mongo client, hashing pool and worker threads are
+# all created on first use in each process.
+
+
+def init_extensions(app):
+    Database(app)
+    # Must hook into Mongo before the first client is created
+    Instrumentation(app)
+    mail = Mail(app)
+    CORS(app)
+    PasswordHasher(app)
+    MailQueue(app, mail)
+    Assets(app)
+    ProgressBuffer(app)
+    ResponseCache(app)
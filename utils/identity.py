@@ -0,0 +1,94 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app, g, session
+from pymongo import ReturnDocument
+
+from utils.cache import TTLCache
+
+# ─────────────────────────────────────
+# SESSION / IDENTITY
+# The cookie only carries `user_id` and `uv` (the user's session_version).
+# Everything else is resolved from a bounded in-process cache of user
+# profiles. Profile edits bump session_version in MongoDB, so a stale
+# cached profile in another worker process is detected and reloaded.
+# ─────────────────────────────────────
+PROFILE_PROJECTION = {
+    "first_name": 1,
+    "last_name": 1,
+    "email": 1,
+    "role": 1,
+    "profile_pic": 1,
+    "profile_pic_variants": 1,
+    "session_version": 1,
+}
+
+profile_cache = TTLCache(maxsize=4096, ttl=600)
+
+
+def login_user(user):
+    session.clear()
+    session["user_id"] = str(user["_id"])
+    session["uv"] = user.get("session_version", 0)
+    profile_cache.set(session["user_id"], {k: user[k] for k in ("_id", *PROFILE_PROJECTION) if k in user})
+
+
+def logout_user():
+    user_id = session.pop("user_id", None)
+    session.pop("uv", None)
+    if user_id:
+        profile_cache.pop(user_id)
+
+
+def _load_profile(user_id):
+    try:
+        return current_app.db.users.find_one({"_id": ObjectId(user_id)}, PROFILE_PROJECTION)
+    except InvalidId:
+        return None
+
+
+def get_current_user():
+    """The logged-in user's profile (no password hash), or None.
+
+    Served from the profile cache when its version matches the cookie's,
+    so most requests resolve identity without touching MongoDB.
+    """
+    if "current_user_profile" in g:
+        return g.current_user_profile
+
+    user_id = session.get("user_id")
+    profile = None
+    if user_id:
+        profile = profile_cache.get(user_id)
+        if profile is None or profile.get("session_version", 0) != session.get("uv", 0):
+            profile = _load_profile(user_id)
+            if profile:
+                profile_cache.set(user_id, profile)
+                session["uv"] = profile.get("session_version", 0)
+            else:
+                logout_user()
+
+    g.current_user_profile = profile
+    return profile
+
+
+def current_role():
+    profile = get_current_user()
+    return profile.get("role") if profile else None
+
+
+def update_current_user(fields):
+    """Write profile fields, bump the session version and refresh this worker's cache."""
+    user_id = session["user_id"]
+    profile = current_app.db.users.find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        {"$set": fields, "$inc": {"session_version": 1}},
+        projection=PROFILE_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if profile:
+        profile_cache.set(user_id, profile)
+        session["uv"] = profile.get("session_version", 0)
+    else:
+        profile_cache.pop(user_id)
+    g.pop("current_user_profile", None)
+    return profile
@@ -0,0 +1,131 @@
+import glob
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from werkzeug.utils import secure_filename
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; uploads are then stored as-is
+    Image = None
+
+ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = (("webp", "WEBP", {"quality": 80, "method": 4}), ("jpg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}))
+
+VARIANT_NAME = re.compile(r"^(?P<base>.+)-(?P<width>\d+)\.(?:webp|jpg)$")
+
+# Resizing is mostly done in Pillow's C code, which releases the GIL
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="images")
+
+
+def variant_name(name, width, ext):
+    base = os.path.splitext(name)[0]
+    return f"{base}-{width}.{ext}"
+
+
+def is_variant(folder, name):
+    """True for a file generate_variants() wrote: base-<width>.jpg with its .webp twin (or vice versa).
+
+    Matches any width, including a source's own width when it was narrower
+    than every VARIANT_WIDTHS entry.
+    """
+    match = VARIANT_NAME.match(name)
+    if not match:
+        return False
+    base, width = match.group("base", "width")
+    return all(os.path.exists(os.path.join(folder, f"{base}-{width}.{ext}")) for ext, _, _ in VARIANT_FORMATS)
+
+
+def existing_variants(folder, name):
+    """Widths whose variants are already on disk, so identical uploads skip the resize."""
+    base = os.path.splitext(name)[0]
+    widths = []
+    for path in glob.glob(os.path.join(glob.escape(folder), glob.escape(base) + "-*.jpg")):
+        width = os.path.basename(path)[len(base) + 1:-len(".jpg")]
+        if width.isdigit() and os.path.exists(os.path.join(folder, variant_name(name, width, "webp"))):
+            widths.append(int(width))
+    return sorted(widths)
+
+
+def generate_variants(data, folder, name, widths=VARIANT_WIDTHS):
+    """Decode an image once and write WebP and JPEG copies at each width not wider than the source.
+
+    Returns the list of widths written.
+    """
+    if Image is None:
+        return []
+
+    with Image.open(BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGB")
+
+    written = []
+    targets = [width for width in widths if width < image.width] or [image.width]
+    for width in targets:
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for ext, fmt, options in VARIANT_FORMATS:
+            path = os.path.join(folder, variant_name(name, width, ext))
+            tmp_path = f"{path}.tmp"
+            resized.save(tmp_path, fmt, **options)
+            os.replace(tmp_path, path)
+        written.append(width)
+    return written
+
+
+def save_upload(file, folder):
+    """Save an uploaded image under a content-hash name.
+
+    Returns (filename, data, variant_widths), or (None, None, []) for an empty
+    or disallowed file. Identical bytes map to the same name, so a re-upload
+    reuses the stored file and any variants already generated for it.
+    """
+    ext = os.path.splitext(secure_filename(file.filename or ""))[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        return None, None, []
+    data = file.read()
+    if not data:
+        return None, None, []
+
+    name = hashlib.sha256(data).hexdigest()[:20] + ext
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, name)
+    if not os.path.exists(path):
+        with open(path, "wb") as out:
+            out.write(data)
+    return name, data, existing_variants(folder, name)
+
+
+def schedule_variants(data, folder, name, on_variants):
+    """Resize in the worker pool, then call on_variants(widths) from the worker thread."""
+    if Image is None:
+        return None
+
+    def work():
+        try:
+            written = generate_variants(data, folder, name)
+        except Exception as e:
+            print("Error resizing image:", name, e)
+            return
+        if written:
+            on_variants(written)
+
+    return _executor.submit(work)
+
+
+def generate_folder_variants(folder):
+    """Build variants for every original image in `folder` that doesn't have them yet.
+
+    Yields (filename, widths) for each image processed.
+    """
+    for name in sorted(os.listdir(folder)):
+        ext = os.path.splitext(name)[1].lower()
+        if ext not in ALLOWED_EXTENSIONS or is_variant(folder, name) or existing_variants(folder, name):
+            continue
+        with open(os.path.join(folder, name), "rb") as source:
+            data = source.read()
+        yield name, generate_variants(data, folder, name)
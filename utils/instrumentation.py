@@ -0,0 +1,224 @@
+import bisect
+import contextvars
+import json
+import logging
+import threading
+import time
+
+from flask import Response, abort, current_app, g, request, template_rendered, before_render_template
+from pymongo import monitoring
+from werkzeug.local import LocalProxy
+
+slow_request_log = logging.getLogger("elearn.slow_requests")
+
+# Seconds, Prometheus-style cumulative buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("started", "db_count", "db_seconds", "collections", "template_seconds", "_template_started")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_seconds = 0.0
+        self.collections = {}        # collection -> [count, seconds]
+        self.template_seconds = 0.0
+        self._template_started = []
+
+    def add_query(self, collection, seconds):
+        self.db_count += 1
+        self.db_seconds += seconds
+        entry = self.collections.setdefault(collection, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+class QueryMonitor(monitoring.CommandListener):
+    """Attributes every MongoDB command to the Flask request that issued it.
+
+    PyMongo's synchronous API fires `started` on the calling thread, so the
+    request's context variable is visible there; the stats object is then
+    carried to `succeeded`/`failed`, which may run after the context has moved on.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        stats = _current.get()
+        if stats is None:
+            return
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            # getMore carries the cursor id there and the collection separately
+            collection = event.command.get("collection", event.command_name)
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = (stats, collection)
+
+    def _finish(self, event):
+        with self._lock:
+            entry = self._inflight.pop((event.connection_id, event.request_id), None)
+        if entry is not None:
+            stats, collection = entry
+            stats.add_query(collection, event.duration_micros / 1e6)
+
+    succeeded = _finish
+    failed = _finish
+
+
+class RouteHistogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.db_queries = 0
+
+    def observe(self, seconds, db_queries):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.db_queries += db_queries
+
+
+class Instrumentation:
+    """Per-request DB/template timing, Server-Timing headers, a slow-request log and /metrics.
+
+    Metrics are kept per process; under gunicorn each worker reports its own
+    counters, which Prometheus sums across scrape targets.
+
+    Config:
+        SLOW_REQUEST_MS         log requests slower than this (default 500)
+        SERVER_TIMING_HEADER    add Server-Timing to responses (default True)
+        METRICS_TOKEN           if set, /metrics requires "Authorization: Bearer <token>"
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.query_monitor = QueryMonitor()
+        self.slow_request_ms = 500
+        self._routes = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.slow_request_ms = app.config.get("SLOW_REQUEST_MS", self.slow_request_ms)
+        app.extensions["instrumentation"] = self
+        if "mongo" in app.extensions:
+            app.extensions["mongo"].add_listener(self.query_monitor)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        before_render_template.connect(self._template_started, app)
+        template_rendered.connect(self._template_finished, app)
+        app.add_url_rule("/metrics", "metrics", self.metrics_view)
+
+    # ── request lifecycle ──
+    def _before_request(self):
+        stats = RequestStats()
+        g.request_stats = stats
+        g.request_stats_token = _current.set(stats)
+
+    def _template_started(self, sender, template, context, **extra):
+        stats = _current.get()
+        if stats is not None:
+            stats._template_started.append(time.perf_counter())
+
+    def _template_finished(self, sender, template, context, **extra):
+        stats = _current.get()
+        if stats is not None and stats._template_started:
+            stats.template_seconds += time.perf_counter() - stats._template_started.pop()
+
+    def _after_request(self, response):
+        stats = g.get("request_stats")
+        if stats is None:
+            return response
+        total = time.perf_counter() - stats.started
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+
+        with self._lock:
+            histogram = self._routes.get((route, request.method))
+            if histogram is None:
+                histogram = self._routes[(route, request.method)] = RouteHistogram()
+            histogram.observe(total, stats.db_count)
+
+        if self.app.config.get("SERVER_TIMING_HEADER", True):
+            app_seconds = max(0.0, total - stats.db_seconds - stats.template_seconds)
+            response.headers["Server-Timing"] = (
+                f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_count} queries", '
+                f"tpl;dur={stats.template_seconds * 1000:.1f}, "
+                f"app;dur={app_seconds * 1000:.1f}, "
+                f"total;dur={total * 1000:.1f}"
+            )
+
+        if total * 1000 >= self.slow_request_ms:
+            slow_request_log.warning(json.dumps({
+                "event": "slow_request",
+                "method": request.method,
+                "route": route,
+                "path": request.path,
+                "status": response.status_code,
+                "total_ms": round(total * 1000, 1),
+                "db_ms": round(stats.db_seconds * 1000, 1),
+                "db_queries": stats.db_count,
+                "template_ms": round(stats.template_seconds * 1000, 1),
+                "collections": {
+                    name: {"count": count, "ms": round(seconds * 1000, 1)}
+                    for name, (count, seconds) in stats.collections.items()
+                },
+            }))
+        return response
+
+    def _teardown_request(self, exc=None):
+        token = g.pop("request_stats_token", None)
+        if token is not None:
+            _current.reset(token)
+
+    # ── Prometheus exposition ──
+    def render_metrics(self):
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                "# HELP elearn_request_duration_seconds Request latency by route.",
+                "# TYPE elearn_request_duration_seconds histogram",
+            ]
+            for (route, method), histogram in routes:
+                labels = f'route="{route}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+                    cumulative += count
+                    lines.append(f'elearn_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'elearn_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"elearn_request_duration_seconds_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"elearn_request_duration_seconds_count{{{labels}}} {histogram.count}")
+            lines += [
+                "# HELP elearn_request_db_queries_total MongoDB commands issued, by route.",
+                "# TYPE elearn_request_db_queries_total counter",
+            ]
+            for (route, method), histogram in routes:
+                lines.append(f'elearn_request_db_queries_total{{route="{route}",method="{method}"}} {histogram.db_queries}')
+
+        if "mongo" in self.app.extensions:
+            pool = self.app.extensions["mongo"].metrics()
+            lines += [
+                "# TYPE elearn_mongo_pool_in_use gauge",
+                f"elearn_mongo_pool_in_use {pool['in_use']}",
+                "# TYPE elearn_mongo_pool_checkout_failures_total counter",
+                f"elearn_mongo_pool_checkout_failures_total {pool['checkout_failures']}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self):
+        token = self.app.config.get("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            abort(401)
+        return Response(self.render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+instrumentation = LocalProxy(lambda: current_app.extensions["instrumentation"])
@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_mail import Message
+from pymongo import ReturnDocument
+from werkzeug.local import LocalProxy
+
+
+class MailQueue:
+    """Outbound mail spooled in the `mail_outbox` collection and sent by a background thread.
+
+    Requests only insert a document; the worker claims batches, sends each
+    batch over one SMTP connection, and reschedules failures with
+    exponential backoff. Each process starts its worker on its first
+    request (MAIL_QUEUE_AUTOSTART), so mail left in the outbox by a restart
+    goes out without waiting for the next enqueue(). For local testing point
+    MAIL_SERVER/MAIL_PORT at a debugging server, e.g.
+    `python -m aiosmtpd -n -l localhost:1025`.
+    """
+
+    def __init__(self, app=None, mail=None):
+        self.app = None
+        self.mail = None
+        self.batch_size = 20
+        self.poll_interval = 2.0
+        self.max_attempts = 5
+        self.backoff_seconds = 30
+        self.lock_timeout = 300
+        self._worker = None
+        self._worker_pid = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app, mail)
+
+    def init_app(self, app, mail):
+        self.app = app
+        self.mail = mail
+        self.batch_size = app.config.get("MAIL_QUEUE_BATCH_SIZE", self.batch_size)
+        self.poll_interval = app.config.get("MAIL_QUEUE_POLL_INTERVAL", self.poll_interval)
+        self.max_attempts = app.config.get("MAIL_QUEUE_MAX_ATTEMPTS", self.max_attempts)
+        self.backoff_seconds = app.config.get("MAIL_QUEUE_BACKOFF", self.backoff_seconds)
+        app.mail_queue = self
+        app.extensions["mail_queue"] = self
+        if app.config.get("MAIL_QUEUE_AUTOSTART", True):
+            # Not at startup: a thread started before a pre-forking server forks wouldn't survive
+            app.before_request(self.ensure_worker)
+
+    # ─────────────────────────────────────
+    # Enqueue (request side)
+    # ─────────────────────────────────────
+    def enqueue(self, subject, recipients, body):
+        now = datetime.now()
+        self.app.db.mail_outbox.insert_one({
+            "subject": subject,
+            "recipients": list(recipients),
+            "body": body,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        })
+        self.ensure_worker()
+        self._wakeup.set()
+
+    # ─────────────────────────────────────
+    # Delivery (worker side)
+    # ─────────────────────────────────────
+    def _claim_batch(self, db):
+        now = datetime.now()
+        claimed = []
+        while len(claimed) < self.batch_size:
+            doc = db.mail_outbox.find_one_and_update(
+                {"$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    # A worker died mid-send; take the message over
+                    {"status": "sending", "locked_at": {"$lt": now - timedelta(seconds=self.lock_timeout)}},
+                ]},
+                {"$set": {"status": "sending", "locked_at": now}},
+                sort=[("next_attempt_at", 1)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is None:
+                break
+            claimed.append(doc)
+        return claimed
+
+    def _reschedule(self, db, doc, error):
+        attempts = doc.get("attempts", 0) + 1
+        failed = attempts >= self.max_attempts
+        db.mail_outbox.update_one({"_id": doc["_id"]}, {"$set": {
+            "status": "failed" if failed else "pending",
+            "attempts": attempts,
+            "last_error": str(error),
+            "next_attempt_at": datetime.now() + timedelta(seconds=self.backoff_seconds * 2 ** (attempts - 1)),
+        }})
+
+    def deliver_batch(self):
+        """Send one batch over a single SMTP connection. Returns (sent, failed)."""
+        db = self.app.db
+        batch = self._claim_batch(db)
+        if not batch:
+            return 0, 0
+
+        sent = failed = 0
+        try:
+            with self.mail.connect() as connection:
+                for doc in batch:
+                    try:
+                        connection.send(Message(doc["subject"], recipients=doc["recipients"], body=doc["body"]))
+                    except Exception as e:
+                        self._reschedule(db, doc, e)
+                        failed += 1
+                    else:
+                        db.mail_outbox.update_one(
+                            {"_id": doc["_id"]},
+                            {"$set": {"status": "sent", "sent_at": datetime.now()}, "$unset": {"locked_at": ""}},
+                        )
+                        sent += 1
+        except Exception as e:
+            # Couldn't connect (or the connection dropped): retry whatever wasn't sent
+            for doc in batch[sent + failed:]:
+                self._reschedule(db, doc, e)
+                failed += 1
+        return sent, failed
+
+    def drain(self):
+        """Deliver batches until nothing is due. Returns total (sent, failed)."""
+        total_sent = total_failed = 0
+        with self.app.app_context():
+            while True:
+                sent, failed = self.deliver_batch()
+                total_sent += sent
+                total_failed += failed
+                if not sent and not failed:
+                    return total_sent, total_failed
+
+    def _run(self):
+        while True:
+            try:
+                self.drain()
+            except Exception as e:
+                print("Mail worker error:", e)
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def ensure_worker(self):
+        """Start the worker thread in this process if it isn't running (e.g. after a fork)."""
+        if self._worker_pid == os.getpid() and self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="mail-queue", daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+
+mail_queue = LocalProxy(lambda: current_app.extensions["mail_queue"])
@@ -0,0 +1,169 @@
+import os
+import time
+from threading import BoundedSemaphore, Lock
+
+import bcrypt
+from flask import current_app
+from werkzeug.local import LocalProxy
+
+DEFAULT_LOG_ROUNDS = 12
+BCRYPT_MAX_BYTES = 72
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should ask the user to retry."""
+
+
+# ─────────────────────────────────────
+# bcrypt calls
+# ─────────────────────────────────────
+def _encode(password):
+    # bcrypt only uses the first 72 bytes; newer releases refuse longer input
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode()
+
+
+def _check_password(pw_hash, password):
+    try:
+        return bcrypt.checkpw(_encode(password), pw_hash.encode())
+    except ValueError:
+        return False  # Malformed stored hash
+
+
+def hash_rounds(pw_hash):
+    """Cost factor stored in a `$2b$12$...` hash, or None if it can't be read."""
+    try:
+        return int(pw_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class _LatencyStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+        }
+
+
+class PasswordHasher:
+    """Runs bcrypt directly on the request thread, with at most `max_workers` hashes at once.
+
+    bcrypt releases the GIL while it hashes, so other threads keep serving
+    requests meanwhile, and calling it in place avoids handing the password
+    to a pool (and the caller would block on the result either way).
+    At most `max_pending` hashes may be waiting or running; beyond that calls
+    wait up to `queue_timeout` seconds for a slot and then raise
+    PasswordHasherBusy.
+    """
+
+    def __init__(self, app=None):
+        self.rounds = DEFAULT_LOG_ROUNDS
+        self.max_workers = os.cpu_count() or 1
+        self.max_pending = 64
+        self.queue_timeout = 5.0
+        self._slots = None
+        self._running = None
+        self._stats_lock = Lock()
+        self._pending = 0
+        self._latency = {"hash": _LatencyStats(), "check": _LatencyStats()}
+        self.rehashes = 0
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get("BCRYPT_LOG_ROUNDS", DEFAULT_LOG_ROUNDS)
+        self.max_workers = app.config.get("PASSWORD_HASH_WORKERS") or os.cpu_count() or 1
+        self.max_pending = app.config.get("PASSWORD_HASH_MAX_PENDING", 64)
+        self.queue_timeout = app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5.0)
+        self._slots = BoundedSemaphore(self.max_pending)
+        self._running = BoundedSemaphore(self.max_workers)
+        app.password_hasher = self
+        app.extensions["password_hasher"] = self
+
+    def _acquire(self, semaphore, deadline):
+        if semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            return True
+        with self._stats_lock:
+            self.rejected += 1
+        return False
+
+    def _run(self, kind, func, *args):
+        if self._slots is None:
+            self._slots = BoundedSemaphore(self.max_pending)
+            self._running = BoundedSemaphore(self.max_workers)
+        deadline = time.monotonic() + self.queue_timeout
+        if not self._acquire(self._slots, deadline):
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._pending += 1
+        try:
+            # More concurrent hashes than cores would only slow each one down
+            if not self._acquire(self._running, deadline):
+                raise PasswordHasherBusy("Password hashing queue is full")
+            try:
+                return func(*args)
+            finally:
+                self._running.release()
+        finally:
+            with self._stats_lock:
+                self._pending -= 1
+                self._latency[kind].add(time.perf_counter() - started)
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run("hash", _hash_password, password, self.rounds)
+
+    def check(self, pw_hash, password):
+        if not pw_hash or password is None:
+            return False
+        return self._run("check", _check_password, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        return hash_rounds(pw_hash) != self.rounds
+
+    def check_and_upgrade(self, pw_hash, password):
+        """Verify a password; if it's right but stored at a different cost, return a new hash too.
+
+        Returns (valid, new_hash_or_None).
+        """
+        if not self.check(pw_hash, password):
+            return False, None
+        if not self.needs_rehash(pw_hash):
+            return True, None
+        with self._stats_lock:
+            self.rehashes += 1
+        return True, self.hash(password)
+
+    def metrics(self):
+        with self._stats_lock:
+            return {
+                "rounds": self.rounds,
+                "workers": self.max_workers,
+                "queue_depth": self._pending,
+                "max_pending": self.max_pending,
+                "rejected": self.rejected,
+                "rehashes": self.rehashes,
+                "hash": self._latency["hash"].as_dict(),
+                "check": self._latency["check"].as_dict(),
+            }
+
+
+password_hasher = LocalProxy(lambda: current_app.extensions["password_hasher"])
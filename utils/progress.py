@@ -0,0 +1,139 @@
+import atexit
+import os
+import threading
+from datetime import datetime
+
+from bson import ObjectId
+from flask import current_app
+from pymongo import UpdateOne
+from werkzeug.local import LocalProxy
+
+
+def parse_heartbeat(data):
+    """Validate a heartbeat body; returns (fields for record(), None) or (None, error message)."""
+    if not isinstance(data, dict):
+        return None, "Expected a JSON object"
+    lesson = data.get("lesson")
+    position = data.get("position")
+    # bool is an int subclass, so True would otherwise pass as lesson 1
+    if lesson is not None and (isinstance(lesson, bool) or not isinstance(lesson, int) or lesson < 0):
+        return None, "lesson must be a non-negative integer"
+    if position is not None and (isinstance(position, bool) or not isinstance(position, (int, float)) or position < 0):
+        return None, "position must be a non-negative number of seconds"
+    return {"lesson": lesson, "position": position, "completed": bool(data.get("completed"))}, None
+
+
+class ProgressBuffer:
+    """Coalesces lesson-progress heartbeats in memory and flushes them to `enrollments` in bulk.
+
+    Each (student, course) pair keeps only its latest lesson/position plus the
+    set of lessons completed since the last flush, so any number of
+    heartbeats per interval turns into one UpdateOne per active viewer.
+    Heartbeats are buffered per process; at most `flush_interval` seconds of
+    progress can be lost if a worker is killed.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.flush_interval = 5.0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._stop = threading.Event()
+        self.heartbeats = 0
+        self.flushed_writes = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config.get("PROGRESS_FLUSH_INTERVAL", self.flush_interval)
+        app.progress_buffer = self
+        app.extensions["progress_buffer"] = self
+        atexit.register(self.flush)
+
+    def record(self, student_id, course_id, lesson=None, position=None, completed=False):
+        key = (ObjectId(student_id), ObjectId(course_id))
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = {"completed": set()}
+            if lesson is not None:
+                entry["lesson"] = lesson
+            if position is not None:
+                entry["position"] = position
+            if completed and lesson is not None:
+                entry["completed"].add(lesson)
+            entry["at"] = datetime.now()
+            self.heartbeats += 1
+        self.ensure_worker()
+
+    def _build_updates(self, batch):
+        updates = []
+        for (student_id, course_id), entry in batch.items():
+            update = {"$set": {"last_activity_at": entry["at"]}}
+            if "lesson" in entry:
+                update["$set"]["last_lesson"] = entry["lesson"]
+            if "position" in entry:
+                update["$set"]["last_position"] = entry["position"]
+            if entry["completed"]:
+                update["$addToSet"] = {"progress": {"$each": sorted(entry["completed"])}}
+            # No upsert: heartbeats for courses the student isn't enrolled in match nothing
+            updates.append(UpdateOne({"student_id": student_id, "course_id": course_id}, update))
+        return updates
+
+    def flush(self):
+        """Write everything buffered so far in one unordered bulk_write. Returns the number of updates."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch or self.app is None:
+            return 0
+
+        updates = self._build_updates(batch)
+        try:
+            with self.app.app_context():
+                self.app.db.enrollments.bulk_write(updates, ordered=False)
+        except Exception as e:
+            print("Error flushing lesson progress:", e)
+            self._requeue(batch)
+            return 0
+        self.flushed_writes += len(updates)
+        return len(updates)
+
+    def _requeue(self, batch):
+        # Newer heartbeats that arrived during the failed flush win
+        with self._lock:
+            for key, entry in batch.items():
+                newer = self._pending.get(key)
+                if newer is None:
+                    self._pending[key] = entry
+                else:
+                    newer["completed"] |= entry["completed"]
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def ensure_worker(self):
+        """Start the flush thread in this process if it isn't running (e.g. after a fork)."""
+        if self._worker_pid == os.getpid() and self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="progress-flush", daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "heartbeats": self.heartbeats,
+                "flushed_writes": self.flushed_writes,
+                "flush_interval": self.flush_interval,
+            }
+
+
+progress_buffer = LocalProxy(lambda: current_app.extensions["progress_buffer"])
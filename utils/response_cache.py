@@ -0,0 +1,292 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, make_response, request, session
+from markupsafe import Markup
+from werkzeug.local import LocalProxy
+
+from utils.cache import TTLCache
+from utils.identity import current_role
+
+
+# ─────────────────────────────────────
+# CATALOG VERSION
+# A counter in a file every worker on the host can see, so a course created
+# in one worker retires the cached copies in all of them.
+# ─────────────────────────────────────
+def _write_atomic(directory, path, data):
+    # Write-then-rename so readers never see a partial file
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CatalogVersion:
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, "VERSION")
+        self._cached = (None, 0)  # (file identity, version); a stat per read, a file read only after a bump
+
+    def get(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return 0
+        # bump() replaces the file, so the inode changes even within one mtime tick
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        if identity != self._cached[0]:
+            try:
+                with open(self.path) as file:
+                    self._cached = (identity, int(file.read() or 0))
+            except (OSError, ValueError):
+                pass
+        return self._cached[1]
+
+    def bump(self):
+        version = self.get() + 1
+        try:
+            _write_atomic(self.directory, self.path, str(version).encode())
+        except OSError as e:
+            print(f"⚠️ Response cache invalidation failed: {e}")
+        return version
+
+
+# ─────────────────────────────────────
+# BACKENDS
+# Both store picklable values under tuple keys that include the catalog
+# version, so bumping it moves every worker to a fresh namespace.
+# ─────────────────────────────────────
+class MemoryBackend:
+    """Per-process LRU; entries from an older catalog version are dropped on the next lookup."""
+
+    def __init__(self, version, maxsize=4096, ttl=60):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.catalog_version = version
+        self._seen = None
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        self.entries.set(key, value)
+
+    def version(self):
+        version = self.catalog_version.get()
+        if version != self._seen:
+            # Unreachable under the new version; free the memory now
+            self.entries.clear()
+            self._seen = version
+        return version
+
+    def bump(self):
+        self.catalog_version.bump()
+        self.version()
+
+    def stats(self):
+        return dict(self.entries.stats(), backend="memory", version=self.catalog_version.get())
+
+
+class FileSystemBackend:
+    """One pickle per entry in `directory`, shared by every worker on the host."""
+
+    SUFFIX = ".cache"
+
+    def __init__(self, version, directory, ttl=60):
+        self.directory = directory
+        self.ttl = ttl
+        self.catalog_version = version
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode()).hexdigest() + self.SUFFIX)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                expires, value = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        if expires < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        try:
+            _write_atomic(self.directory, self._path(key), pickle.dumps((time.time() + self.ttl, value), pickle.HIGHEST_PROTOCOL))
+        except OSError as e:
+            print(f"⚠️ Response cache write failed: {e}")
+
+    def version(self):
+        return self.catalog_version.get()
+
+    def bump(self):
+        self.catalog_version.bump()
+        # Old entries are unreachable now; reclaim the space
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(self.SUFFIX):
+                        os.remove(entry.path)
+        except OSError as e:
+            print(f"⚠️ Response cache cleanup failed: {e}")
+
+    def stats(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                size = sum(1 for entry in entries if entry.name.endswith(self.SUFFIX))
+        except OSError:
+            size = 0
+        lookups = self.hits + self.misses
+        return {
+            "backend": "filesystem",
+            "version": self.version(),
+            "size": size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# ─────────────────────────────────────
+# RESPONSE CACHE
+# Whole pages for anonymous visitors, rendered fragments and query results
+# for everyone else, all keyed by the catalog version so creating a course
+# (invalidate()) retires every cached copy at once, in every worker.
+# ─────────────────────────────────────
+class ResponseCache:
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        kind = app.config.get("RESPONSE_CACHE_BACKEND")
+        ttl = app.config.get("RESPONSE_CACHE_TTL", 60)
+        directory = app.config.get("RESPONSE_CACHE_DIR") or os.path.join(app.instance_path, "response_cache")
+        if kind == "memory":
+            self.backend = MemoryBackend(CatalogVersion(directory), app.config.get("RESPONSE_CACHE_MAXSIZE", 4096), ttl)
+        elif kind == "filesystem":
+            self.backend = FileSystemBackend(CatalogVersion(directory), directory, ttl)
+        elif kind:
+            raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND {kind!r} (expected 'memory', 'filesystem' or None)")
+        else:
+            self.backend = None
+        app.extensions["response_cache"] = self
+        app.jinja_env.globals["cache_fragment"] = self.fragment
+
+    def version(self):
+        # One stat of the VERSION file per request, however many fragments it renders
+        if not has_request_context():
+            return self.backend.version()
+        if "response_cache_version" not in g:
+            g.response_cache_version = self.backend.version()
+        return g.response_cache_version
+
+    def key(self, kind, *parts):
+        return (kind, self.version()) + parts
+
+    def memoize(self, parts, compute):
+        """Cache compute()'s result (e.g. a catalog query) under the current version."""
+        if self.backend is None:
+            return compute()
+        key = self.key("data", *parts)
+        value = self.backend.get(key)
+        if value is None:
+            value = compute()
+            self.backend.set(key, value)
+        return value
+
+    def fragment(self, *parts, caller):
+        """Jinja call block: {% call cache_fragment('course-card', course._id) %}...{% endcall %}.
+
+        The viewer's role is always part of the key; pass anything else the
+        block depends on (e.g. whether the viewer is enrolled).
+        """
+        if self.backend is None:
+            return caller()
+        key = self.key("fragment", current_role() or "anonymous", *parts)
+        html = self.backend.get(key)
+        if html is None:
+            html = str(caller())
+            self.backend.set(key, html)
+        return Markup(html)
+
+    def serve_page(self, view, args, kwargs):
+        """See cached_page()."""
+        if request.method != "GET" or self.backend is None:
+            return view(*args, **kwargs)
+
+        # Pending flash messages are per-visitor, so those pages aren't shared
+        anonymous = "user_id" not in session and "_flashes" not in session
+        key = None
+        if anonymous:
+            key = self.key("page", request.endpoint, request.path, tuple(sorted(request.args.items(multi=True))))
+            entry = self.backend.get(key)
+            if entry is not None:
+                response = current_app.response_class(entry["body"], mimetype=entry["mimetype"])
+                response.set_etag(entry["etag"])
+                response.headers["X-Cache"] = "HIT"
+                return self._conditional(response, anonymous)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+            return response
+        response.add_etag()
+        if key is not None and not session.modified:
+            self.backend.set(key, {"body": response.get_data(), "etag": response.get_etag()[0], "mimetype": response.mimetype})
+            response.headers["X-Cache"] = "MISS"
+        return self._conditional(response, anonymous)
+
+    @staticmethod
+    def _conditional(response, anonymous):
+        # Always revalidate: the ETag makes that a cheap 304
+        response.cache_control.no_cache = True
+        if not anonymous:
+            response.cache_control.private = True
+        response.vary.add("Cookie")
+        return response.make_conditional(request)
+
+    def invalidate(self):
+        if self.backend is not None:
+            self.backend.bump()
+            if has_request_context():
+                g.pop("response_cache_version", None)
+
+    def stats(self):
+        return self.backend.stats() if self.backend is not None else {"backend": None}
+
+
+response_cache = LocalProxy(lambda: current_app.extensions["response_cache"])
+
+
+def cached_page(view):
+    """Serve the whole page from cache to anonymous visitors; add ETag/304 for everyone.
+
+    Logged-in pages still render (the navbar is per-user) but get a
+    validator, so an unchanged page costs a 304 instead of the full body.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        return current_app.extensions["response_cache"].serve_page(view, args, kwargs)
+    return wrapper
@@ -0,0 +1,238 @@
+import bisect
+import heapq
+import math
+import re
+import time
+from collections import Counter
+from threading import RLock, Thread
+
+from werkzeug.local import LocalProxy
+
+from utils.course_utils import load_catalog_courses
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("a an and are as at be by for from in into is it of on or the to with".split())
+
+# Matches in a title count three times as much as matches in a description
+FIELD_WEIGHTS = {"title": 3.0, "instructor_name": 1.5, "description": 1.0, "lessons": 1.0}
+
+# Course fields kept per document so results render without a DB round-trip
+RESULT_FIELDS = ("_id", "title", "slug", "description", "instructor_id", "instructor_name", "image", "image_variants", "enrollment_count")
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+class SearchIndex:
+    """An in-memory inverted index over courses with BM25 ranking and prefix suggestions.
+
+    Documents are keyed by slug and can be added or replaced one at a time, so a
+    newly created course is searchable without rebuilding the whole index.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}      # term -> {slug: weighted term frequency}
+        self._doc_terms = {}     # slug -> Counter of weighted term frequencies
+        self._lengths = {}       # slug -> weighted document length
+        self._docs = {}          # slug -> result dict
+        self._total_length = 0.0
+        self._terms = []         # sorted vocabulary, for prefix lookups
+        self._norms = None       # slug -> BM25 length normalisation, rebuilt lazily after writes
+        self._lock = RLock()
+        self.built_at = 0.0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, slug, fields, doc):
+        """Index (or re-index) one document. `fields` maps a FIELD_WEIGHTS name to its text."""
+        weighted = Counter()
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for token in tokenize(text):
+                weighted[token] += weight
+
+        with self._lock:
+            self.remove(slug)
+            self._doc_terms[slug] = weighted
+            self._lengths[slug] = sum(weighted.values())
+            self._total_length += self._lengths[slug]
+            self._docs[slug] = doc
+            self._norms = None
+            for term, tf in weighted.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._terms, term)
+                postings[slug] = tf
+
+    def remove(self, slug):
+        with self._lock:
+            terms = self._doc_terms.pop(slug, None)
+            if terms is None:
+                return
+            self._total_length -= self._lengths.pop(slug)
+            del self._docs[slug]
+            self._norms = None
+            for term in terms:
+                postings = self._postings[term]
+                del postings[slug]
+                if not postings:
+                    del self._postings[term]
+                    index = bisect.bisect_left(self._terms, term)
+                    del self._terms[index]
+
+    def _length_norms(self):
+        if self._norms is None:
+            avg_length = self._total_length / len(self._docs)
+            k1, b = self.k1, self.b
+            self._norms = {slug: k1 * (1 - b + b * length / avg_length) for slug, length in self._lengths.items()}
+        return self._norms
+
+    def _expand_prefix(self, prefix, limit=50):
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\uffff")
+        return self._terms[start:min(end, start + limit)]
+
+    def search(self, query, limit=20):
+        """BM25-ranked documents for `query`. The last word also matches as a prefix."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            doc_count = len(self._docs)
+            if not doc_count:
+                return []
+            norms = self._length_norms()
+
+            query_terms = set(tokens[:-1])
+            query_terms.update(self._expand_prefix(tokens[-1]) or [tokens[-1]])
+
+            scores = Counter()
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                weight = (self.k1 + 1) * math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for slug, tf in postings.items():
+                    scores[slug] += weight * tf / (tf + norms[slug])
+
+            return [self._docs[slug] for slug in heapq.nlargest(limit, scores, key=scores.__getitem__)]
+
+    def suggest(self, prefix, limit=8):
+        """Autocomplete: vocabulary terms starting with `prefix`, most common first."""
+        tokens = TOKEN_RE.findall((prefix or "").lower())
+        if not tokens:
+            return []
+        with self._lock:
+            candidates = self._expand_prefix(tokens[-1], limit=500)
+            candidates.sort(key=lambda term: -len(self._postings[term]))
+            return candidates[:limit]
+
+
+# ─────────────────────────────────────
+# COURSE INDEX
+# Built from MongoDB plus the lesson titles in data/courses.json, then kept
+# current by add_course() in this process and by a periodic rebuild so
+# courses created in other workers show up too.
+# ─────────────────────────────────────
+REBUILD_INTERVAL = 300
+REBUILD_RETRY_AFTER = 60
+_index = SearchIndex()
+_index_lock = RLock()
+_rebuilding = None   # courses added since the running background rebuild started, else None
+_retry_at = 0.0      # after a failed rebuild, no new one starts before this time
+
+
+def _course_fields(course, lessons=()):
+    return {
+        "title": course.get("title"),
+        "description": course.get("description"),
+        "instructor_name": course.get("instructor_name") or course.get("instructor"),
+        "lessons": " ".join(lesson.get("title", "") for lesson in lessons),
+    }
+
+
+def _result_doc(course):
+    doc = {field: course.get(field) for field in RESULT_FIELDS if course.get(field) is not None}
+    doc.setdefault("instructor_name", course.get("instructor"))
+    doc.setdefault("image", "default_course.jpg")
+    return doc
+
+
+def build_course_index(db):
+    """Index every course in MongoDB; data/courses.json only contributes lesson titles.
+
+    Courses that exist only in the file can't be enrolled in or opened, so
+    they aren't returned, matching the /courses listing.
+    """
+    index = SearchIndex()
+    lessons_by_slug = {course.get("slug"): course.get("lessons", []) for course in load_catalog_courses()}
+
+    projection = {field: 1 for field in RESULT_FIELDS}
+    for course in db.courses.find({}, projection):
+        if not course.get("slug"):
+            continue
+        lessons = lessons_by_slug.get(course["slug"], [])
+        index.add(course["slug"], _course_fields(course, lessons), _result_doc(course))
+    index.built_at = time.monotonic()
+    return index
+
+
+def _rebuild(db):
+    global _index, _rebuilding, _retry_at
+    try:
+        index = build_course_index(db)
+    except Exception as e:
+        print("Error rebuilding search index:", e)
+        with _index_lock:
+            # Keep serving the old index; don't start a rebuild on every search while MongoDB is down
+            _retry_at = time.monotonic() + REBUILD_RETRY_AFTER
+            _rebuilding = None
+        return
+    with _index_lock:
+        # The rebuild's find() may have run before these were inserted
+        for course in _rebuilding:
+            _add(index, course)
+        _index, _rebuilding = index, None
+
+
+def get_search_index(db):
+    """The current index, rebuilt every REBUILD_INTERVAL seconds.
+
+    Only the very first build (nothing to serve yet; warm_up() normally does
+    it before workers fork) blocks. After that a stale index keeps answering
+    while a background thread builds its replacement, which is swapped in
+    atomically. A failed rebuild is retried after REBUILD_RETRY_AFTER seconds.
+    """
+    global _index, _rebuilding
+    if not _index.built_at:
+        with _index_lock:
+            if not _index.built_at:
+                _index = build_course_index(db)
+    elif _rebuilding is None and time.monotonic() > max(_index.built_at + REBUILD_INTERVAL, _retry_at):
+        with _index_lock:
+            if _rebuilding is None:
+                _rebuilding = []
+                # The thread runs outside the request, so pass it the database itself
+                if isinstance(db, LocalProxy):
+                    db = db._get_current_object()
+                Thread(target=_rebuild, args=(db,), name="search-rebuild", daemon=True).start()
+    return _index
+
+
+def _add(index, course):
+    lessons = next((c.get("lessons", []) for c in load_catalog_courses() if c.get("slug") == course.get("slug")), [])
+    index.add(course["slug"], _course_fields(course, lessons), _result_doc(course))
+
+
+def add_course(course):
+    """Make a just-created course searchable in this process immediately."""
+    with _index_lock:
+        _add(_index, course)
+        if _rebuilding is not None:
+            _rebuilding.append(course)